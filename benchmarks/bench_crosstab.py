@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Jan 24 11:05:31 2025
+
+@author: Bodhi Global Analysis (Jungyeon Lee)
+"""
+
+"""
+Breakdown tables of a single-variable indicator: melt + groupby against the crosstab on group codes (pongamia_dataset)
+- Six breakdown columns, as in the livelihood indicators (Gender, Age group, Country, State, Residency status, Disability)
+- Weighted: same crosstab with design weights (weighted np.bincount), all weights 1 so the counts can be checked
+- Peak memory is the peak of Python allocations (tracemalloc) while the tables are built
+- The script stops with an error if any table differs
+
+python benchmarks/bench_crosstab.py [numbers of respondents]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pongamia_dataset as ds
+import pongamia_schema as sc
+
+breakdowns = {'3': ['Male', 'Female'], '2': ['18-24', '25-34', '35-44', '45-54', '55+'], '4': ['Sudan', 'South Sudan'],
+              'state': ['Blue Nile', 'Central Equatoria', 'Gedaref', 'Jonglei', 'Kassala', 'Upper Nile', 'White Nile'],
+              '7': ['Host community', 'IDP', 'Refugee', 'Returnee'], 'Disability': ['Disability', 'No Disability']}
+answers = ['Strongly disagree', 'Disagree', 'Neutral', 'Agree', 'Strongly agree']
+
+def melt_tables(df, var):
+    """
+    - Breakdown tables as they were built in Data_analysis.tables
+    """
+    tables = {}
+    melted = df.melt(id_vars=list(breakdowns), value_vars=var, var_name=' ', value_name='category_value')
+    for col in breakdowns:
+        count_df = melted.groupby(['category_value', col], observed=False).size().unstack(fill_value=0)
+        tables[col] = (count_df, round(count_df.div(count_df.sum(axis=0), axis=1) * 100, 2))
+    return tables
+
+def crosstab_tables(df, var):
+    """
+    - Breakdown tables from the group codes of a dataset context (factorised once, then one np.bincount per breakdown)
+    """
+    tables = {}
+    data = ds.Dataset_context(df)
+    row = ds.factorise(df[var])
+    for col in breakdowns:
+        count_df = ds.crosstab(row, data.group_codes(col), column_name=col)
+        tables[col] = (count_df, round(count_df.div(count_df.sum(axis=0), axis=1) * 100, 2))
+    return tables
+
+def weighted_tables(df, var):
+    """
+    - Breakdown tables counted with design weights (Data_analysis.tables with a weight column)
+    """
+    tables = {}
+    data = ds.Dataset_context(df)
+    row = ds.factorise(df[var])
+    weights = data.row_weights('w')
+    for col in breakdowns:
+        count_df = ds.crosstab(row, data.group_codes(col), column_name=col, weights=weights)
+        tables[col] = (count_df, round(count_df.div(count_df.sum(axis=0), axis=1) * 100, 2))
+    return tables
+
+def measure(function, df, var):
+    tracemalloc.start()
+    start = time.perf_counter()
+    tables = function(df, var)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+    tracemalloc.stop()
+    return tables, elapsed, peak
+
+def dataset(n, rng):
+    df = pd.DataFrame({col: rng.choice(np.array(values, dtype=object), n) for col, values in breakdowns.items()})
+    df['q'] = rng.choice(np.array(answers + [np.nan], dtype=object), n)
+    schema = {col: ('category', values) for col, values in breakdowns.items()}
+    schema['q'] = ('ordered', answers)
+    df = sc.apply_schema(df, schema)
+    df['w'] = 1.0
+    return df
+
+if __name__ == '__main__':
+    sizes = [int(n) for n in sys.argv[1:]] or [10000, 100000, 1000000]
+    rng = np.random.default_rng(0)
+    print(f'{len(breakdowns)} breakdowns, 1 variable')
+    print(f"{'Respondents':>11} | {'Melt (s)':>8} | {'Crosstab (s)':>12} | {'Weighted (s)':>12} | {'Melt peak (MB)':>14} | {'Crosstab peak (MB)':>18}")
+    for n in sizes:
+        df = dataset(n, rng)
+        expected, melt_time, melt_peak = measure(melt_tables, df, 'q')
+        result, cross_time, cross_peak = measure(crosstab_tables, df, 'q')
+        weighted, weighted_time, weighted_peak = measure(weighted_tables, df, 'q')
+        for col in breakdowns:
+            for old, new, new_weighted in zip(expected[col], result[col], weighted[col]):
+                pd.testing.assert_frame_equal(old, new)
+                pd.testing.assert_frame_equal(old.astype(float), new_weighted)
+        print(f'{n:>11} | {melt_time:>8.3f} | {cross_time:>12.3f} | {weighted_time:>12.3f} | {melt_peak:>14.1f} | {cross_peak:>18.1f}')
+    print('All versions give identical tables')
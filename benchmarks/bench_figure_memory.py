@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Jan 15 14:20:05 2025
+
+@author: Bodhi Global Analysis (Jungyeon Lee)
+"""
+
+"""
+Peak memory of the chart rendering as the number of indicators grows
+- Every indicator renders one overall chart and a count and a percentage chart per breakdown
+- Each run happens in a fresh process so that the peak RSS of one run does not leak into the next
+- Peak RSS should stay flat (figures are closed after saving)
+
+python benchmarks/bench_figure_memory.py
+"""
+
+import os
+import sys
+import subprocess
+import tempfile
+import resource
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+def render(n_indicators, breakdowns=2):
+    import numpy as np
+    import pandas as pd
+    import pongamia_charts as ch
+
+    rng = np.random.default_rng(0)
+    categories = ['Very low', 'Low', 'Moderate', 'High', 'Very high']
+    groups = ['Sudan', 'South Sudan']
+    folder = tempfile.mkdtemp()
+    jobs = []
+    for i in range(n_indicators):
+        meta = {'indicator_name': f'indicator{i}', 'description': f'Indicator {i}', 'var_order': categories,
+                'breakdown': {f'b{b}': f'Breakdown {b}' for b in range(breakdowns)},
+                'i_type': 'Percentage', 'target': None, 'baseline': 50, 'midline': None}
+        count = rng.integers(1, 100, len(categories))
+        overall = pd.DataFrame({'Count': count, 'Percentage': np.round(count / count.sum() * 100, 1)}, index=categories)
+        jobs.append({'kind': 'overall', 'meta': meta, 'df': overall, 'folder': f'{folder}/', 'colname': None, 'output': ''})
+        for b in range(breakdowns):
+            count_df = pd.DataFrame(rng.integers(1, 100, (len(categories), len(groups))), index=categories, columns=groups)
+            percent_df = round(count_df.div(count_df.sum(axis=0), axis=1) * 100, 2)
+            jobs.append({'kind': 'count', 'meta': meta, 'df': count_df, 'folder': f'{folder}/', 'colname': f'b{b}', 'output': ''})
+            jobs.append({'kind': 'percentage', 'meta': meta, 'df': percent_df, 'folder': f'{folder}/', 'colname': f'b{b}', 'output': ''})
+    ch.render_charts(jobs, max_workers=1)
+    print(peak_rss_mb())
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2 and sys.argv[1] == '--child':
+        render(int(sys.argv[2]))
+        sys.exit(0)
+
+    sizes = [int(n) for n in sys.argv[1:]] or [1, 2, 4, 8]
+    print(f"{'Indicators':>10} | {'Charts':>6} | {'Peak RSS (MB)':>13}")
+    peaks = []
+    for n in sizes:
+        result = subprocess.run([sys.executable, __file__, '--child', str(n)], capture_output=True, text=True, check=True)
+        peak = float(result.stdout.strip().splitlines()[-1])
+        peaks.append(peak)
+        print(f'{n:>10} | {n * 5:>6} | {peak:>13.1f}')
+    print(f'Growth from {sizes[0]} to {sizes[-1]} indicators: {peaks[-1] / peaks[0]:.2f}x')
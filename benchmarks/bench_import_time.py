@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Jan 29 14:18:52 2025
+
+@author: Bodhi Global Analysis (Jungyeon Lee)
+"""
+
+"""
+Import time of the analysis modules (python -X importtime), each measured in a fresh process
+- Worker processes (max_workers, chart_workers) pay the same import time when they start
+- The script stops with an error if importing a module loads a statistical or plotting backend
+  (they are only imported when a feature that draws a chart or runs a test needs them)
+
+python benchmarks/bench_import_time.py [number of runs per module]
+"""
+
+import os
+import sys
+import subprocess
+import statistics
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+modules = ['pongamia_dataset', 'pongamia_charts', 'pongamia_data_analysis', 'pongamia_PMF', 'pongamia_pipeline']
+backends = ['matplotlib', 'seaborn', 'scipy', 'statsmodels', 'IPython']
+
+def import_time(module):
+    """
+    - Cumulative import time of a module in microseconds, and the backends it loaded
+    module: str, Name of the module
+    """
+    code = f"import sys, {module}; print(','.join(name for name in {backends!r} if name in sys.modules))"
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True, cwd=root, check=True)
+    cumulative = None
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            cumulative = int(parts[1])
+    loaded = [name for name in result.stdout.strip().split(',') if name]
+    return cumulative, loaded
+
+if __name__ == '__main__':
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"{'Module':>22} | {'Import time (ms)':>16} | Backends loaded")
+    failures = []
+    for module in modules:
+        times = []
+        for _ in range(runs):
+            cumulative, loaded = import_time(module)
+            times.append(cumulative / 1000)
+        print(f"{module:>22} | {statistics.median(times):>16.0f} | {', '.join(loaded) or '-'}")
+        if len(loaded) != 0:
+            failures.append(f"{module} loads {', '.join(loaded)}")
+    if len(failures) != 0:
+        raise AssertionError('Backends are imported at module load: ' + '; '.join(failures))
+    print(f'Median of {runs} runs, no statistical or plotting backend is imported at module load')
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Jan 28 10:52:07 2025
+
+@author: Bodhi Global Analysis (Jungyeon Lee)
+"""
+
+"""
+Run time of the indicator tables (Data_analysis.evaluation) with 1, 2, 4, ... worker processes
+- Synthetic livelihood-like survey: answer columns broken down by six demographic columns
+- Every run must write exactly the same statistics workbook as the run without workers
+- Plots are not rendered ('tables' profile), they have their own worker pool (chart_workers)
+
+python benchmarks/bench_parallel_evaluation.py [number of respondents] [number of indicators] [numbers of workers]
+"""
+
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pongamia_indicator as bd
+import pongamia_PMF as pmf
+
+breakdowns = {'3': ['Male', 'Female'], '2': ['18-24', '25-34', '35-44', '45-54', '55+'], '4': ['Sudan', 'South Sudan'],
+              'state': ['Blue Nile', 'Central Equatoria', 'Gedaref', 'Jonglei', 'Kassala', 'Upper Nile', 'White Nile'],
+              '7': ['Host community', 'IDP', 'Refugee', 'Returnee'], 'Disability': ['Disability', 'No Disability']}
+labels = {'3': 'Gender', '2': 'Age group', '4': 'Country', 'state': 'State', '7': 'Residency status', 'Disability': 'Disability'}
+answers = ['Strongly disagree', 'Disagree', 'Neutral', 'Agree', 'Strongly agree']
+
+def dataset(n, n_indicators, rng):
+    df = pd.DataFrame({col: rng.choice(np.array(values, dtype=object), n) for col, values in breakdowns.items()})
+    for i in range(n_indicators):
+        df[f'q{i}'] = rng.choice(np.array(answers + [np.nan], dtype=object), n)
+    return df
+
+def create_indicators(n_indicators):
+    indicators = []
+    for i in range(n_indicators):
+        indicator = bd.Indicator(None, f'question {i}', i, [f'q{i}'], i_cal=None, i_type='percentage', description=f'Question {i}', period='endline', target=None)
+        indicator.add_breakdown(labels)
+        indicator.add_var_order(answers)
+        indicators.append(indicator)
+    return indicators
+
+def run(df, n_indicators, max_workers, file_path):
+    framework = pmf.PerformanceManagementFramework('Benchmark', 'Evaluation', profile='tables', max_workers=max_workers)
+    framework.add_indicators(create_indicators(n_indicators))
+    framework.add_data(df)
+    start = time.perf_counter()
+    framework.PMF_generation(file_path, 'visuals/')
+    return time.perf_counter() - start
+
+def workbook_values(file_path):
+    wb = load_workbook(file_path)
+    return {sheet: list(wb[sheet].iter_rows(values_only=True)) for sheet in wb.sheetnames}
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    n_indicators = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    rng = np.random.default_rng(0)
+    df = dataset(n, n_indicators, rng)
+    folder = tempfile.mkdtemp()
+    workers = [1]
+    while workers[-1] * 2 <= (os.cpu_count() or 1):
+        workers.append(workers[-1] * 2)
+    if len(sys.argv) > 3:
+        workers = [1] + [int(w) for w in sys.argv[3:] if int(w) != 1]
+
+    times = {}
+    stdout = sys.stdout
+    for max_workers in workers:
+        sys.stdout = open(os.devnull, 'w')
+        try:
+            times[max_workers] = run(df, n_indicators, max_workers, os.path.join(folder, f'statistics_{max_workers}.xlsx'))
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+    expected = workbook_values(os.path.join(folder, 'statistics_1.xlsx'))
+    for max_workers in workers[1:]:
+        if workbook_values(os.path.join(folder, f'statistics_{max_workers}.xlsx')) != expected:
+            raise AssertionError(f'The workbook built with {max_workers} workers differs from the workbook built without workers')
+
+    print(f'{n} respondents, {n_indicators} indicators, {len(breakdowns)} breakdowns, {os.cpu_count()} cores')
+    print(f"{'Workers':>7} | {'Time (s)':>8} | {'Speed-up':>8}")
+    for max_workers in workers:
+        print(f'{max_workers:>7} | {times[max_workers]:>8.2f} | {times[1] / times[max_workers]:>7.2f}x')
+    print('All runs give identical workbooks')
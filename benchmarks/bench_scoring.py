@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Jan 16 15:26:10 2025
+
+@author: Bodhi Global Analysis (Jungyeon Lee)
+"""
+
+"""
+Timing of the vectorised scoring engine (pongamia_scoring) against the previous row-by-row calculation
+- The row-wise reference, the scoring cases and the check that both give the same labels are in tests/test_scoring.py
+
+python benchmarks/bench_scoring.py [number of respondents]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests'))
+import pongamia_scoring as sc
+from test_scoring import cases, dataset, rowwise, valid_points
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    df = dataset(n)
+
+    print(f'{n} respondents')
+    print(f"{'Method':<22} | {'Row-wise (s)':>12} | {'Vectorised (s)':>14} | {'Speed-up':>8}")
+    for label, method, var, case_map, column in cases:
+        valid_point = valid_points.get(method)
+        start = time.perf_counter()
+        rowwise(df, method, valid_point, column, case_map) if method == 'score' else rowwise(df, method, valid_point)
+        rowwise_time = time.perf_counter() - start
+        start = time.perf_counter()
+        sc.pass_status(df, method, var, case_map, valid_point)
+        vector_time = time.perf_counter() - start
+        print(f'{label:<22} | {rowwise_time:>12.3f} | {vector_time:>14.4f} | {rowwise_time / vector_time:>7.0f}x')
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Jan 21 09:48:26 2025
+
+@author: Bodhi Global Analysis (Jungyeon Lee)
+"""
+
+"""
+Vectorised WG-SS disability classification (pongamia_builders) against the previous row-by-row classification
+- Both versions must give exactly the same WG-Disability and Disability labels
+- The script stops with an error if any label differs
+
+python benchmarks/bench_wgss.py [number of respondents]
+"""
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pongamia_builders as bld
+
+cols = ['wg_1', 'wg_2', 'wg_3', 'wg_4', 'wg_5', 'wg_6']
+
+def rowwise(df, cols):
+    """
+    - Row-by-row classification as it was done in Preprocessing.disability_wgss
+    """
+    def wg_ss(row, cols):
+        values = row[cols]
+        some_difficulty_count = (values == 'Some difficulty').sum()
+        a_lot_of_difficulty = (values == 'A lot of difficulty').any() or (values == 'Cannot do at all').any()
+        cannot_do_at_all = (values == 'Cannot do at all').any()
+        if cannot_do_at_all:
+            return 'DISABILITY4'
+        elif a_lot_of_difficulty:
+            return 'DISABILITY3'
+        elif some_difficulty_count >= 2:
+            return 'DISABILITY2'
+        elif some_difficulty_count >= 1:
+            return 'DISABILITY1'
+        else:
+            return 'No_disability'
+    wg = df.apply(lambda row: wg_ss(row, cols), axis=1)
+    return wg, wg.apply(lambda x: 'Disability' if x in ['DISABILITY4', 'DISABILITY3'] else 'No Disability')
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = np.random.default_rng(0)
+    answers = np.array(['No difficulty', 'Some difficulty', 'A lot of difficulty', 'Cannot do at all', 'Prefer not to say', np.nan], dtype=object)
+    df = pd.DataFrame({col: rng.choice(answers, n, p=[0.7, 0.15, 0.06, 0.03, 0.03, 0.03]) for col in cols})
+
+    start = time.perf_counter()
+    expected_wg, expected_disability = rowwise(df, cols)
+    rowwise_time = time.perf_counter() - start
+    start = time.perf_counter()
+    result = bld.disability_wgss(df.copy(), cols)
+    vector_time = time.perf_counter() - start
+
+    if not (expected_wg.equals(result['WG-Disability'].astype(object)) and expected_disability.equals(result['Disability'].astype(object))):
+        raise AssertionError('The vectorised WG-SS labels differ from the row-wise classification')
+    print(f'{n} respondents, {len(cols)} WG-SS domains')
+    print(f"{'Row-wise (s)':>12} | {'Vectorised (s)':>14} | {'Speed-up':>8}")
+    print(f'{rowwise_time:>12.3f} | {vector_time:>14.4f} | {rowwise_time / vector_time:>7.0f}x')
+    print('Both classifications give identical results')
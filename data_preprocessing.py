@@ -19,6 +19,10 @@ file_type = 'xlsx'
 file_path = "Data/24-NEF-GLO-1 - Raw_data"
 # Original data location and name (excluding file extension): "Data/(name)"
 
+chunksize = None
+# For large csv exports, read the raw data in chunks of this many rows (for example 50000)
+# None: read the whole file at once
+
 file_path_others = "Data/24-NEF-GLO-1 - Open-End.xlsx"
 # Specify the path and name of the Excel sheet where the values from the open-ended columns will be saved (New file)
 # For example: "Data/(project name) others.xlsx"
@@ -69,6 +73,26 @@ cols_new = ['start','end','today','deviceid','Enumerator',
  '_128-old', '_id', '_uuid', '_submission_time', '_validation_status', '_notes', '_status', '_submitted_by', '__version__', '_tags', '_index']
 # Specify new column names for data analysis (ensure they match the exact order of the existing columns)
 
+yes_no = ['Yes', 'No']
+level = ['Very low', 'Low', 'Moderate', 'High', 'Very high']
+difficulty = ['No difficulty', 'Some difficulty', 'A lot of difficulty', 'Cannot do at all']
+quality = ['Very Poor', 'Poor', 'Average', 'Good', 'Excellent']
+yes_no_cols = ['0', '11', '12', '13', '14', '15', '17', '18', '27', '34', '38a', '42', '44', '47', '49', '50', '56', '59', '61', '62',
+ '67', '68', '69', '70', '71', '72', '75', '78', '79', '80', '81', '89', '90', '91', '92', '93', '94', '95', '96', '97', '98',
+ '100', '101', '102', '103', '104', '109', '113', '124', '125', '126', '127', '128', '129', '131', '133', '135', '139']
+yes_no_cols += [col for col in cols_new if col.split('-')[0] in ['9', '16', '19', '46', '54', '58', '66', '99', '108', '114', '115', '122', '123'] and '-' in col]
+yes_no_cols += [f'105-I-{i}' for i in range(1, 15)]
+schema = {col: ('category', yes_no) for col in yes_no_cols}
+schema.update({col: ('category', yes_no + ['Unsure']) for col in ['116', '130', '132', '134', '136']})
+schema.update({col: ('ordered', level) for col in ['110', '117', '138', '141']})
+schema.update({col: ('ordered', difficulty) for col in ['20', '21', '22', '23', '24', '25']})
+schema.update({col: ('ordered', quality) for col in ['53', '65']})
+schema.update({col: ('category', None) for col in ['2', '3', '4', '7', '26', '28', '29', '30', '31', '32', '35', '39', '40', '41',
+ '43', '48', '55', '60', '73', '76', '77', '82', '84', '85', '86', '87', '88', '106', '118', '119', '120', '121', '137']})
+# Dtype of each column after renaming: (type, answers) (see pongamia_schema.py)
+# -> Ordered answers should match the var_order of the indicators (Indicator.add_var_order)
+# -> None: do not convert the columns (keep the types read from the file)
+
 list_del_cols = ['start','end','deviceid','Enumerator','9a','16a','19a','33a','36a','37a', '46a', '54a', '58a', '66a', '74a','74-d1','74-d2','74-d3',
  '74-d4', '74-d5', "83a", '99a', '105a', '108a', '114a', '115a', 'DD', 'start-geopoint',
  '_start-geopoint_latitude', '_start-geopoint_longitude', '_start-geopoint_altitude', '_start-geopoint_precision',
@@ -103,5 +127,7 @@ del_type = 0 or 1
       Then, remove all remaining missing values from the columns where they are detected
 """
 
-pongamia = dp.Preprocessing(project_name, file_path, file_path_others, list_del_cols, dates, miss_col, respondent_name, enumerators, identifiers, open_cols, cols_new, states, locations, age_col, diss_cols, del_type = 0, file_type=file_type)
-pongamia.processing()
\ No newline at end of file
+# The preprocessing only runs when this file is executed (pongamia_pipeline.py imports the schema from it)
+if __name__ == '__main__':
+    pongamia = dp.Preprocessing(project_name, file_path, file_path_others, list_del_cols, dates, miss_col, respondent_name, enumerators, identifiers, open_cols, cols_new, states, locations, age_col, diss_cols, del_type = 0, file_type=file_type, chunksize=chunksize, schema=schema)
+    pongamia.processing()
\ No newline at end of file
@@ -5,21 +5,59 @@ Created on Tue Sep 17 15:47:28 2024
 
 @author: Bodhi Global Analysis (Jungyeon Lee)
 """
+import os
 import pandas as pd
 import pongamia_data_analysis as bodhi
+import pongamia_workbook as wbk
+import pongamia_charts as ch
+import pongamia_dataset as ds
+import pongamia_cache as ca
 
 class PerformanceManagementFramework:
     
-    def __init__(self, name, ptype):
+    def __init__(self, name, ptype, write_only=False, chart_workers=None, profile='report', cache=None, max_workers=1, batch=False, significance=False, weights=None, reuse=False):
         """
         - Initialise the Performance Management Framework class
 
         name: str, Name of the project
         ptype: str, Type of the project (KAP, Evaluation)
+        write_only: bool, Stream the statistics workbook sheet by sheet instead of keeping it in memory
+        chart_workers: int, Number of processes rendering the plots (None: all cores, 1: no worker processes)
+        profile: str, Render quality of the plots
+        -> 'report': Print quality PNG files (800 dpi)
+        -> 'draft': Low resolution PNG files, for iterating on the indicator definitions
+        -> 'vector': SVG files
+        -> 'tables': No plots, only the statistics workbook
+        cache: str, Folder of the analysis cache, unchanged indicators reuse their tables and plots (None: no cache)
+        -> Each PMF uses its own subfolder, files of older runs are removed once the PMF has been generated
+        -> The cache files are pickles, use a folder that only trusted users can write to
+        max_workers: int, Number of processes building the indicator tables (None: all cores, 1: no worker processes)
+        batch: bool, Batch run: the plots are drawn with the raster-only Agg backend through the Figure API, without pyplot
+        -> No interactive backend or GUI toolkit is loaded, which is safe on servers and in worker processes
+        significance: bool, Write the p-values of each breakdown next to its block (chi-square, or ANOVA for numeric scores)
+        weights: str, Column of the design weights, the tables show weighted counts with the effective sample size and design effect
+        -> None: Every respondent counts once
+        reuse: bool, Each rendering process draws every chart on one reused figure per size instead of a new figure per chart
         """
         self.name = name
         self.ptype = ptype
+        self.write_only = write_only
+        self.chart_workers = chart_workers
+        if profile not in ch.render_profiles:
+            print(f"Please use one of the render profiles: {', '.join(ch.render_profiles)} ('report' will be used)")
+            profile = 'report'
+        self.profile = profile
+        self.cache = cache
+        self.max_workers = max_workers
+        self.batch = batch
+        self.significance = significance
+        self.weights = weights
+        self.reuse = reuse
+        if batch:
+            # Selected before pyplot is first imported
+            ch.batch_backend()
         self.indicators = []
+        self.data = None
 
     def add_indicators(self, indicators):
         """
@@ -31,7 +69,50 @@ class PerformanceManagementFramework:
             self.indicators.append(indicator)
             print(f'{indicator.indicator_name} has been added to the data analysis pipeline')
             
-        self.tool = bodhi.Data_analysis(self.name, self.indicators)
+        self.tool = bodhi.Data_analysis(self.name, self.indicators, self.data)
+        # Indicators created without data are calculated once the data is added (add_data)
+        frames = [indicator.df for indicator in indicators if indicator.df is not None]
+        if self.data is None and len(frames) != 0:
+            if any(frame is not frames[0] for frame in frames):
+                print("All indicators of the PMF share one dataset, the dataset of the first indicator will be used")
+            return self.add_data(frames[0])
+        if self.data is not None:
+            self.tool.indicator_analysis()
+        return True
+
+    def required_columns(self):
+        """
+        - Columns of the dataset needed by the indicators of the PMF (to load only these columns)
+        """
+        columns = []
+        for indicator in self.indicators:
+            columns += indicator.columns()
+        if self.weights is not None:
+            columns.append(self.weights)
+        return list(dict.fromkeys(columns))
+
+    def add_data(self, df):
+        """
+        - Add the dataset shared by all indicators and calculate the indicators
+        -> Indicators only refer to its columns by name, they do not keep their own dataframe
+
+        df: Dataframe, Dataframe of this project
+        """
+        return self.add_context(ds.Dataset_context(df))
+
+    def add_context(self, data):
+        """
+        - Add a dataset context shared by all indicators (a segment of a segmented run) and calculate the indicators
+
+        data: Dataset_context, Dataset of this PMF (pongamia_dataset)
+        """
+        missing = [col for col in self.required_columns() if col not in data.df.columns]
+        if len(missing) != 0:
+            print(f"These columns are not in the dataset: {missing}")
+        self.data = data
+        for indicator in self.indicators:
+            indicator.df = None
+        self.tool.data = self.data
         self.tool.indicator_analysis()
         return True
 
@@ -39,16 +120,85 @@ class PerformanceManagementFramework:
         """
         - Generate tables from all the indicators
         file_path1: str, Directory to save the tables
-        file_path2: str, Directory to save the chi2 test results
         folder: str, Directory to save the plots
         """
-        empty_df1 = pd.DataFrame()
-        with pd.ExcelWriter(file_path1, engine='openpyxl') as writer:
-            empty_df1.to_excel(writer, sheet_name='Tables', index=False)
+        book = wbk.Workbook_session(file_path1, write_only=self.write_only)
+        self.tool.significance = self.significance
+        self.tool.weights = self.weights
+        if self.weights is not None and self.weights not in self.data.df.columns:
+            print(f"The weight column '{self.weights}' is not in the dataset, every respondent will count once")
+            self.tool.weights = None
+        if self.cache is not None:
+            settings = (self.name, self.ptype, folder, self.profile, self.significance, self.weights, self.reuse)
+            self.tool.cache = ca.Analysis_cache(os.path.join(self.cache, self.name), settings=settings)
             
         if self.ptype == 'Evaluation':
-            self.tool.evaluation(file_path1, folder)
+            self.tool.evaluation(book, folder, self.max_workers)
         elif self.ptype == 'KAP':
-            self.tool.kap(file_path1, folder)
+            self.tool.kap(book, folder)
+        book.save()
+        self.tool.render_charts(self.chart_workers, reuse=self.reuse, profile=self.profile, batch=self.batch)
+        if self.tool.cache is not None:
+            print(f'{self.tool.cache.hits} of {len(self.indicators)} indicators have been taken from the cache')
+            removed = self.tool.cache.prune()
+            if removed != 0:
+                print(f'{removed} outdated cache files have been removed')
         
-        print("\nData analysis has been finished")
\ No newline at end of file
+        print("\nData analysis has been finished")
+
+class Segmented_PMF:
+
+    def __init__(self, column):
+        """
+        - Initialise a segmented run: several PMFs, each over a segment of one dataset
+        -> The dataset is loaded and prepared once, the breakdown columns are factorised once for all segments,
+           and calculations shared by several segments (same method and variables) are done once
+
+        column: str, Column defining the segments (e.g. '0': survey type)
+        """
+        self.column = column
+        self.segments = []
+
+    def add_segment(self, framework, values, file_path, folder):
+        """
+        - Add a PMF and the rows it is run on
+
+        framework: PerformanceManagementFramework, PMF of the segment (indicators added without data)
+        values: list, Values of the segment column in this segment (None: all rows)
+        file_path: str, Directory to save the tables of this segment
+        folder: str, Directory to save the plots of this segment
+        """
+        self.segments.append({'framework': framework, 'values': values, 'file_path': file_path, 'folder': folder})
+
+    def required_columns(self):
+        """
+        - Columns of the dataset needed by the PMFs of all segments (to load only these columns)
+        """
+        columns = [self.column]
+        for segment in self.segments:
+            columns += segment['framework'].required_columns()
+        return list(dict.fromkeys(columns))
+
+    def add_data(self, df):
+        """
+        - Add the dataset to every segment and calculate the indicators of all segments
+        -> Segments are row masks on the same dataframe, the rows are not copied
+
+        df: Dataframe, Dataframe of this project
+        """
+        data = ds.Dataset_context(df)
+        for segment in self.segments:
+            if segment['values'] is None:
+                rows = None
+            else:
+                rows = df[self.column].isin(segment['values']).to_numpy()
+            segment['framework'].add_context(data.segment(rows))
+        return True
+
+    def PMF_generation(self):
+        """
+        - Generate the tables and plots of every segment
+        """
+        for segment in self.segments:
+            segment['framework'].PMF_generation(segment['file_path'], segment['folder'])
+        return True
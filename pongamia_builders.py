@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Jan 20 10:15:48 2025
+
+@author: Bodhi Global Analysis (Jungyeon Lee)
+"""
+
+"""
+Indicator builders for the data pre-processing
+- Every builder works on whole columns at once (no row-by-row apply)
+"""
+
+import pandas as pd
+import numpy as np
+
+def answer_scores(series, mapping):
+    """
+    - To convert the answers of a column into numeric scores (answers missing from the mapping become NaN)
+    series: Series, Column of the survey answers
+    mapping: dic, Score of each answer {'Good': 0.75, etc}
+    """
+    return series.map(mapping).astype(float)
+
+def output121(df):
+    """
+    - To calculate Output 1.2.1 (access to safe drinking water in the dry and rainy seasons)
+    df: Dataframe, Dataframe of this project
+    """
+    source_conditions = ['Handpump or borehole', 'Protected shallow well', 'Protected dug well', 'Tube well', 'Tap stand']
+    df['dry_access_source'] = np.where(df['43'].isin(source_conditions), 1, 0)
+    df['rainy_access_source'] = np.where(df['55'].isin(source_conditions), 1, 0)
+
+    df['dry_access_time'] = round((df['51'] * 2 + df['52']) / 30, 2)
+    df['rainy_access_time'] = round((df['63'] * 2 + df['64']) / 30, 2)
+
+    df['dry_availability'] = np.where(df['44'] == 'Yes', 1, round(df['45'] / 7, 2))
+    df['rainy_availability'] = np.where(df['56'] == 'Yes', 1, round(df['57'] / 7, 2))
+
+    status_mapping = {
+        'Minor repair': 0.67,
+        'Major repair': 0.33,
+        'It is beyond repair': 0}
+    df['dry_status'] = pd.Series(np.where(df['47'] == 'Yes', 1, np.nan), index=df.index).fillna(answer_scores(df['48'], status_mapping))
+    df['rainy_status'] = df['dry_status'].fillna(answer_scores(df['60'], status_mapping))
+
+    df['dry_animal'] = np.where(df['50'] == 'Yes', 0, 1)
+    df['rainy_animal'] = np.where(df['62'] == 'Yes', 0, 1)
+
+    df['dry_fencing'] = np.where(df['49'] == 'Yes', 1, 0)
+    df['rainy_fencing'] = np.where(df['61'] == 'Yes', 1, 0)
+
+    quality_mapping = {
+        'Very Poor': 0,
+        'Poor': 0.25,
+        'Average': 0.5,
+        'Good': 0.75,
+        'Excellent': 1}
+    df['dry_quality'] = answer_scores(df['53'], quality_mapping)
+    df['rainy_quality'] = answer_scores(df['65'], quality_mapping)
+
+    access = {}
+    for season in ['dry', 'rainy']:
+        access[season] = (df[f'{season}_access_source'] == 1) & (df[f'{season}_access_time'] <= 1)
+        df[f'{season}_access'] = np.where(access[season], 'Yes', 'No')
+    for season in ['dry', 'rainy']:
+        cols_to_avg = [f'{season}_access_time', f'{season}_availability', f'{season}_status',
+                       f'{season}_animal', f'{season}_fencing', f'{season}_quality']
+        # Score only the water points that are accessible
+        df[f'{season}_score'] = df[cols_to_avg].mean(axis=1).where(access[season])
+
+    df['output_121'] = np.where((df['dry_access'] == 'Yes') & (df['rainy_access'] == 'Yes'), 'Improved', 'Not improved')
+    both_scored = df['dry_score'].notna() & df['rainy_score'].notna()
+    df['output_121_score'] = np.where(both_scored, round((df['dry_score'] + df['rainy_score']) / 2), 'No access')
+    return df
+
+def output122(df):
+    """
+    - To calculate Output 1.2.2 (access to safe sanitation facilities)
+    df: Dataframe, Dataframe of this project
+    """
+    conditions = ['Home latrine', 'Shared latrine', 'Communal latrine']
+    df['latrine_usage'] = np.where(df['73'].isin(conditions), 1, 0)
+    no_latrine = df['latrine_usage'] == 0
+    df['handwashing'] = np.where(df['78'] == 'Yes', 1, 0)
+    ownership = answer_scores(df['73'], {'Home latrine': 1, 'Shared latrine': 0.67, 'Communal latrine': 0.33})
+    df['ownership'] = ownership.mask(no_latrine, 0)
+    df['sanitation_accessibility'] = np.where(no_latrine, 0, np.where(df['75'] == 'Yes', 1, 0))
+    df['sanitation_features'] = np.where(no_latrine, 0, round(df[['74-1', '74-2', '74-3', '74-4']].sum(axis=1) / 4, 2))
+    safety = df[['79', '80', '81']].eq('Yes').sum(axis=1) + answer_scores(df['82'], {'Agree': 1, 'Neither agree nor disagree': 0.5, 'Disagree': 0, 'I do not use latrines': 0})
+    df['sanitation_safety'] = np.where(no_latrine, 0, safety / 4)
+    clean = answer_scores(df['77'], {'Daily': 1, 'Weekly': 0.67}).fillna(0.33)
+    df['sanitation_clean'] = np.where(no_latrine, 0, np.where(df['76'].isin(['No', 'I do not use latrines']), 0, clean))
+    df['output_122'] = np.where(df['latrine_usage'] + df['handwashing'] == 2, 'Improved', 'Not improved')
+    df['output_122_score'] = np.where(df['output_122'] == 'No', 'No access',
+                                      df[['ownership', 'sanitation_accessibility', 'sanitation_features', 'sanitation_safety', 'sanitation_clean']].mean(axis=1))
+    return df
+
+def sri_6_work_status(df):
+    """
+    - SRI domain 6 (employment barriers)
+    df: Dataframe, Dataframe of this project
+    """
+    return np.where(df['33-9'] == 1, 5, np.where(df['34'] == 'Yes', 1, 3))
+
+def sri_8_income_sources(df):
+    """
+    - SRI domain 8 (income sources selected in question 36)
+    df: Dataframe, Dataframe of this project
+    """
+    others_7 = df[['36-1', '36-2', '36-3', '36-4', '36-5', '36-6']].sum(axis=1)
+    others_6 = df[['36-1', '36-2', '36-3', '36-4', '36-5', '36-7']].sum(axis=1)
+    conditions = [
+        (df['36-7'] == 1) & (others_7 == 0), # 36-7 is 1, and all other columns are 0
+        (df['36-6'] == 1) & (others_6 == 0), # 36-6 is 1, and all other columns are 0
+        (df['36-6'] == 1) & (others_6 > 0), # 36-6 is 1, and any other column is 1
+        (df['36-7'] == 0) & (df['36-6'] == 0)]
+    return np.select(conditions, [3, 5, 3, 1], default=np.nan)
+
+# Self-reliance Index: domain -> answer -> score
+# - 'column' + 'scores': score of each answer of a single-choice question (other answers: NaN)
+# - 'count' + 'scores': score of the number of selected options (+ 'top': option that scores 5 on its own)
+# - 'mean': average of other domains
+# - 'rule': function of the dataframe for domains that cannot be expressed as a table
+# Domains are created in the order of the table
+sri_table = {
+    'domains': {
+        'sri_1a': {'column': '26', 'scores': {
+            'No shelter': 1,
+            'Makeshift shelter (shack, kiosk, vehicle)/Shelter not fit for safe habitation': 2,
+            'Temporarily hosted by friends, family, community/faith group, or emergency shelter': 3,
+            'Traditional hut, inadequate': 4,
+            'Traditional hut, adequate': 5}},
+        'sri_1b': {'column': '28', 'scores': {
+            '2-3 times': 1,
+            '1 time': 3,
+            'None': 5,
+            'Not applicable': 0}},
+        'sri_2': {'column': '29', 'scores': {
+            'Household did not eat yesterday': 1,
+            'Household was able to eat, but not even a full meal': 2,
+            'Household was able to eat 1 full meal': 3,
+            'Household was able to eat 2-3 full meals': 5}},
+        'sri_3': {'column': '30', 'scores': {
+            'No school-aged children in household': 0,
+            'None are in school': 1,
+            'Some are in school': 3,
+            'All are in school': 5}},
+        'sri_4': {'column': '31', 'scores': {
+            'Have not needed health care in last 3 months': 0,
+            'Did not receive the needed health care': 1,
+            'Received some of the needed health care': 3,
+            'Received all of the needed health care': 5}},
+        'sri_5': {'column': '32', 'scores': {
+            'Adult(s) in household has health condition that interferes with adult employment': 1,
+            'Dependent(s) in household has health condition that interferes with adult employment': 3,
+            'None of the above': 5}},
+        'sri_6': {'rule': sri_6_work_status},
+        'sri_7': {'column': '35', 'scores': {
+            'No employment': 1,
+            'Temporary, irregular, seasonal': 2,
+            'Regular part-time (including self-employment)': 3,
+            'Full-time (including self-employment), without necessary legal documentation': 4,
+            'Full-time (including self-employment), with legal documentation': 5}},
+        'sri_8': {'rule': sri_8_income_sources},
+        'sri_9': {'count': ['37-2', '37-3', '37-4', '37-5', '37-6'], 'scores': {3: 1, 4: 1, 5: 1, 2: 2, 1: 3}, 'top': '36-1'},
+        'sri_10': {'count': ['38-2', '38-3', '38-4', '38-5', '38-6', '38-7'], 'scores': {5: 1, 4: 1, 3: 2, 2: 2, 1: 3}, 'top': '38-1'},
+        'sri_11': {'column': '39', 'scores': {
+            'No, no savings or saleable assets': 1,
+            'Yes, but not enough to cover one month’s expenses (basic needs)': 3,
+            'Yes, enough to cover one month’s expenses (basic needs)': 4,
+            'Yes, enough to cover one month’s expenses (basic needs) plus enough to purchase an asset, or reinvest into one’s business, or to sustain a moderate health crisis': 5}},
+        'sri_12a': {'column': '40', 'scores': {
+            'Knows no one who could lend money': 1,
+            'Knows someone/ has community support that could lend money': 5}},
+        'sri_12b': {'column': '41', 'scores': {
+            'Neither': 1,
+            'Household members ask others for advice/information ONLY': 3,
+            'People ask household members for advice/information ONLY)': 3,
+            'Both of them': 5}},
+        'sri_12': {'mean': ['sri_12a', 'sri_12b']}},
+    # Domains where a missing score counts as 0
+    'fill': ['sri_1a', 'sri_1b', 'sri_2', 'sri_3', 'sri_4', 'sri_5', 'sri_6', 'sri_9',
+             'sri_7', 'sri_8', 'sri_10', 'sri_11', 'sri_12'],
+    # Domains averaged into the index
+    'average': ['sri_1a', 'sri_1b', 'sri_3', 'sri_4', 'sri_6', 'sri_7', 'sri_8', 'sri_10', 'sri_11', 'sri_12'],
+    # Domain left out of the average when it scores 0 (not applicable)
+    'optional': 'sri_1b',
+    # Domains deducted from the average: (maximum score, weight of each point below the maximum)
+    'penalties': {'sri_2': (5, 0.15), 'sri_5': (3, 0.05), 'sri_9': (5, 0.2)},
+    'range': (1, 5)}
+
+def domain_score(df, spec):
+    """
+    - To score one SRI domain
+    df: Dataframe, Dataframe of this project
+    spec: dic, Scoring rule of the domain (see sri_table)
+    """
+    if 'rule' in spec:
+        return spec['rule'](df)
+    elif 'mean' in spec:
+        return df[spec['mean']].mean(axis=1)
+    elif 'count' in spec:
+        score = df[spec['count']].eq(1).sum(axis=1).map(spec['scores'])
+        if 'top' in spec:
+            score = np.where(df[spec['top']] == 1, 5, score)
+        return score
+    return answer_scores(df[spec['column']], spec['scores'])
+
+def sri_index(df, table=sri_table):
+    """
+    - To calculate the Self-reliance Index score from a domain -> answer -> score table
+    df: Dataframe, Dataframe of this project
+    table: dic, SRI scoring table (sri_table)
+    """
+    for domain, spec in table['domains'].items():
+        df[domain] = domain_score(df, spec)
+    df[table['fill']] = df[table['fill']].fillna(0)
+
+    total = df[table['average']].sum(axis=1)
+    n_domains = len(table['average'])
+    if table.get('optional') is not None:
+        n_domains = n_domains - (df[table['optional']] == 0)
+    sri = total / n_domains
+    for domain, (maximum, weight) in table['penalties'].items():
+        sri = sri - (maximum - df[domain]) * weight
+    df['sri'] = sri.clip(*table['range'])
+    return df
+
+# WG-SS difficulty level of each answer (other answers: no difficulty)
+wgss_levels = {
+    'No difficulty': 0,
+    'Some difficulty': 1,
+    'A lot of difficulty': 2,
+    'Cannot do at all': 3}
+
+def difficulty_matrix(df, cols):
+    """
+    - To build the respondents x domains matrix of WG-SS difficulty levels
+    df: Dataframe, Dataframe of this project
+    cols: list, Columns of the WG-SS questions
+    """
+    levels = [df[col].map(wgss_levels).astype(float).fillna(0).to_numpy() for col in cols]
+    return np.column_stack(levels)
+
+def disability_wgss(df, cols):
+    """
+    - To classify the WG-SS disability level of every respondent at once
+    df: Dataframe, Dataframe of this project
+    cols: list, Columns of the WG-SS questions
+    """
+    levels = difficulty_matrix(df, cols)
+    highest = levels.max(axis=1)
+    some_difficulty_count = (levels == 1).sum(axis=1)
+    conditions = [highest == 3, highest == 2, some_difficulty_count >= 2, some_difficulty_count >= 1]
+    df['WG-Disability'] = np.select(conditions, ['DISABILITY4', 'DISABILITY3', 'DISABILITY2', 'DISABILITY1'], default='No_disability')
+    df['Disability'] = np.where(highest >= 2, 'Disability', 'No Disability')
+    return df
+
+# Country -> (PPP poverty line in USD per person per day, local currency per USD, days of the reference period)
+poverty_lines = {
+    'Sudan': (2.15, 601.5, 30),
+    'South Sudan': (2.15, 130.26, 30)}
+
+def poverty(df, lines=poverty_lines):
+    """
+    - To classify the households below the national poverty line (countries missing from the table: NaN)
+    df: Dataframe, Dataframe of this project
+    lines: dic, Country -> (PPP line, exchange rate, days) {'Sudan': (2.15, 601.5, 30), etc}
+    """
+    table = pd.DataFrame.from_dict(lines, orient='index', columns=['line', 'rate', 'days'])
+    country = df['4'].astype(object)
+    per_person = country.map(table['line'] * table['days'] * table['rate']).astype(float)
+    threshold = round(per_person * df['8'], 0)
+    status = pd.Series(np.where(df['10'] < threshold, 'Poverty', 'Not poverty'), index=df.index, dtype=object)
+    df['National poverty'] = status.where(country.isin(table.index), np.nan)
+    return df
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Jan 27 09:41:18 2025
+
+@author: Bodhi Global Analysis (Jungyeon Lee)
+"""
+
+"""
+Cache of the analysis outputs of each indicator
+- An indicator is looked up by a hash of its definition and of the data used by its tables
+-> Definition: every setting of the indicator (var, breakdown, var_order, var_change, labels, i_cal, score_map, etc)
+-> Data: values, rows and dtypes of the columns used by its tables, after the calculation and the condition
+- Unchanged indicators reuse their tables, their plots are only rendered again when the file is missing
+- Each PMF keeps its files in its own subfolder, files not used by the last complete run of the PMF are removed (prune)
+- The cache files are pickles: loading one can run any code, so the cache folder must only be writable by trusted users
+  (never point it to a shared or downloaded folder)
+"""
+
+import os
+import pickle
+import hashlib
+import pandas as pd
+
+cache_version = 1 # Increase when the tables or plots are built differently, so older cache files are not used
+
+def definition(indicator):
+    """
+    - Settings of an indicator that change its tables or plots (every attribute except its data)
+    -> The condition is part of the data fingerprint (rows used by the tables)
+    indicator: indicator class, Indicator from indicator class (bodhi_indicator)
+    """
+    settings = {key: value for key, value in vars(indicator).items() if key not in ['df', 'condition', 'mask']}
+    return repr(sorted(settings.items()))
+
+def fingerprint(df):
+    """
+    - Hash of the data used by the tables of an indicator (values, row labels, column names and dtypes)
+    df: Dataframe, Rows and columns used by the tables (Dataset_context.frame)
+    """
+    digest = hashlib.sha1()
+    for col in df.columns:
+        dtype = df[col].dtype
+        digest.update(repr((col, str(dtype))).encode())
+        if isinstance(dtype, pd.CategoricalDtype):
+            # Unused categories still appear in the tables of ordered answers
+            digest.update(repr((list(dtype.categories), dtype.ordered)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+class Analysis_cache:
+
+    def __init__(self, folder, settings=None):
+        """
+        - Initialise the analysis cache (one file per indicator output)
+
+        folder: str, Folder where the cache files are kept (trusted folder only, the files are unpickled)
+        settings: tuple, Settings of the run shared by all indicators (PMF name, plot folder, render profile, etc)
+        """
+        self.folder = folder
+        self.settings = settings
+        self.hits = 0
+        self.misses = 0
+        self.used = set() # Keys read or written in this run (prune)
+        os.makedirs(folder, exist_ok=True)
+
+    def key(self, indicator, df):
+        """
+        - Cache key of an indicator
+        indicator: indicator class, Indicator from indicator class (bodhi_indicator)
+        df: Dataframe, Rows and columns used by the tables of the indicator
+        """
+        digest = hashlib.sha1(repr((cache_version, self.settings, definition(indicator))).encode())
+        digest.update(fingerprint(df).encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        - Cached outputs of an indicator (None: not in the cache)
+        key: str, Cache key (key)
+        """
+        file_path = os.path.join(self.folder, f'{key}.pkl')
+        if not os.path.exists(file_path):
+            self.misses += 1
+            return None
+        try:
+            with open(file_path, 'rb') as file:
+                entry = pickle.load(file)
+        except Exception as e:
+            print(f"Cache file could not be read, the indicator will be analysed again: {file_path} | {e}")
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.used.add(key)
+        return entry
+
+    def put(self, key, entry):
+        """
+        - Save the outputs of an indicator
+        key: str, Cache key (key)
+        entry: dic, Outputs of the indicator {'sheets': recorded sheets, 'charts': chart jobs}
+        """
+        file_path = os.path.join(self.folder, f'{key}.pkl')
+        # Written under a temporary name first, an interrupted run never leaves a broken cache file
+        with open(f'{file_path}.tmp', 'wb') as file:
+            pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f'{file_path}.tmp', file_path)
+        self.used.add(key)
+
+    def prune(self):
+        """
+        - Remove the cache files not used in this run (outputs of older definitions or data) and unfinished temporary files
+        -> Only called after every indicator of the PMF has been looked up, so the files of unchanged indicators are kept
+        """
+        removed = 0
+        for file_name in os.listdir(self.folder):
+            key, extension = os.path.splitext(file_name)
+            if (extension == '.pkl' and key not in self.used) or extension == '.tmp':
+                os.remove(os.path.join(self.folder, file_name))
+                removed += 1
+        return removed
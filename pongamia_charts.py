@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Jan 14 09:41:27 2025
+
+@author: Bodhi Global Analysis (Jungyeon Lee)
+"""
+
+import os
+import gc
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import cycle
+
+bodhi_blue = (0.0745, 0.220, 0.396)
+bodhi_grey = (0.247, 0.29, 0.322)
+bodhi_primary_1 = (0.239, 0.38, 0.553)
+bodhi_secondary = (0.133, 0.098, 0.42)
+bodhi_tertiary = (0.047, 0.396, 0.298)
+bodhi_complement = (0.604, 0.396, 0.071)
+
+# Render quality profiles
+# -> report: Print quality for the final report
+# -> draft: Low resolution without the tight bounding box (one draw per chart), for iterating on the indicator definitions
+# -> vector: SVG files (no raster encoding)
+# -> tables: No charts at all, only the statistics workbook
+render_profiles = {
+    'report': {'charts': True, 'dpi': 800, 'format': 'png', 'tight': True},
+    'draft': {'charts': True, 'dpi': 72, 'format': 'png', 'tight': False},
+    'vector': {'charts': True, 'dpi': 72, 'format': 'svg', 'tight': True},
+    'tables': {'charts': False, 'dpi': None, 'format': None, 'tight': False}}
+
+def chart_meta(indicator):
+    """
+    - To extract the indicator details needed for drawing its charts (plain dictionary, can be sent to worker processes)
+    indicator: indicator class, Indicator from indicator class (bodhi_indicator)
+    """
+    return {'indicator_name': indicator.indicator_name, 'description': indicator.description, 'breakdown': indicator.breakdown,
+            'var_order': indicator.var_order, 'i_type': indicator.i_type, 'target': indicator.target,
+            'baseline': indicator.baseline, 'midline': indicator.midline}
+
+def chart_job(kind, indicator, df, folder, colname=None):
+    """
+    - To describe a chart to be rendered later
+    kind: str, Type of the chart ('count', 'percentage' or 'overall')
+    indicator: indicator class, Indicator from indicator class (bodhi_indicator)
+    df: Dataframe, Aggregated dataframe to be plotted
+    folder: str, Folder where the plot will be saved
+    colname: str, Reference column for the breakdown (breakdown charts only)
+    """
+    meta = chart_meta(indicator)
+    if kind == 'count':
+        output = f'{folder}_{meta["indicator_name"]}_{meta["breakdown"][colname]}_count'
+    elif kind == 'percentage':
+        output = f'{folder}_{meta["indicator_name"]}_{meta["breakdown"][colname]}_percent'
+    else:
+        output = f'{folder}_{meta["indicator_name"]}'
+    return {'kind': kind, 'meta': meta, 'df': df.copy(), 'folder': folder, 'colname': colname, 'output': output}
+
+canvases = {}
+
+# Closed figures keep their pixel buffer alive through reference cycles until a garbage collection (render_job)
+uncollected = 0 # Bytes of the pixel buffers of the closed figures since the last collection
+collect_limit = 256 * 1024 ** 2 # A collection runs once the closed buffers reach this size
+
+def batch_backend():
+    """
+    - To select the raster-only Agg backend for batch runs (no interactive backend or GUI toolkit is loaded)
+    -> Called before pyplot is first imported (PerformanceManagementFramework with batch=True, and each worker process)
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+
+@contextmanager
+def chart_figure(figsize, reuse=False, batch=False):
+    """
+    - To open a figure for one chart and release it once the chart has been saved
+    figsize: tuple, Size of plots
+    reuse: bool, Clear and reuse one figure per size instead of creating a new figure for every chart
+    batch: bool, Draw on a Figure with its own Agg canvas, outside pyplot's figure manager (batch runs)
+    """
+    # matplotlib is only loaded when a chart is drawn, runs without plots never import it
+    if batch:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        key = ('batch', figsize)
+        if reuse and key in canvases:
+            fig = canvases[key]
+            fig.clf()
+        else:
+            fig = Figure(figsize=figsize)
+            FigureCanvasAgg(fig)
+            if reuse:
+                canvases[key] = fig
+        ax = fig.add_subplot()
+    else:
+        import matplotlib.pyplot as plt
+        if reuse:
+            if figsize not in canvases or not plt.fignum_exists(canvases[figsize].number):
+                canvases[figsize] = plt.figure(figsize=figsize)
+            fig = canvases[figsize]
+            fig.clf()
+            plt.figure(fig.number)
+            ax = fig.add_subplot()
+        else:
+            fig, ax = plt.subplots(figsize=figsize)
+    try:
+        yield fig, ax
+    finally:
+        if not reuse and not batch:
+            plt.close(fig)
+
+def category_labels(index):
+    """
+    - To turn the categories of an aggregated table into flat text labels
+    index: Index, Index of the aggregated table
+    """
+    return index.map(lambda x: x if isinstance(x, str) else ''.join(map(str, x)) if hasattr(x, '__iter__') else str(x))
+
+def replace_spaces(text):
+    """
+    - To break long category labels into several lines
+    text: str, Category label
+    """
+    delimiters = [' ', '/']
+    if len(text) >= 10:
+        spaces = [i for i, char in enumerate(text) if char in delimiters]
+        if len(spaces) >= 3:
+            text = text[:spaces[0]] + '\n' + text[spaces[0]+1:spaces[2]] + '\n' + text[spaces[2]+1:]
+        elif len(spaces) >= 1:
+            text = text[:spaces[0]] + '\n' + text[spaces[0]+1:]
+    return text
+
+def breakdown_count_bar(meta, df, colname, file_path, figsize=(12, 8), rotation=0, fontsize=12, reuse=False,
+        dpi=800, file_format='png', tight=True, batch=False):
+    """
+    - To generate bar plots through the breakdown data (Count only)
+    meta: dict, Indicator details needed for the chart (chart_meta)
+    df: Dataframe, Disaggregated dataframe
+    colname: str, Reference column for the breakdown
+    file_path: str, Directory where plots will be saved
+    figsize: tuple, Size of plots
+    rotation: int, Rotation angle for the x-axis ticks
+    fontsize: int, Font size for plots
+    reuse: bool, Draw on a reused figure instead of a new one (chart_figure)
+    dpi: int, Resolution of the saved plot
+    file_format: str, File format of the saved plot ('png', 'svg', etc)
+    tight: bool, Crop the saved plot to its content (draws the plot twice)
+    batch: bool, Draw outside pyplot's figure manager (chart_figure)
+    """         
+    from matplotlib.ticker import MaxNLocator
+    breakdown = meta['breakdown'][colname]
+    palette = [bodhi_complement, bodhi_blue, bodhi_tertiary, bodhi_primary_1, bodhi_grey, bodhi_secondary]
+    if meta['var_order'] != None:
+        df = df.loc[meta['var_order']]
+    with chart_figure(figsize, reuse, batch) as (fig, ax):
+        df.plot(kind='bar', stacked=False, width=0.6, color=palette, ax=ax)
+        title = f'{meta["description"]}\nby {breakdown}'
+        output_file = f'{file_path}_{meta["indicator_name"]}_{breakdown}_count.{file_format}'
+    
+        ax.set_ylabel('Count')
+        ax.set_title(title)
+        column_totals = df.sum(axis=0)
+    
+        bar_width = ax.patches[0].get_width()
+        fontsize_auto = max(fontsize * (bar_width / 0.85), 8)
+    
+        for i, column in enumerate(df.columns):
+            for j in range(len(df)):
+                bar_index = i * len(df) + j
+                bar = ax.patches[bar_index]
+                bar_x = bar.get_x() + bar.get_width() / 2
+                bar_height = bar.get_height()
+                value = df[column].iloc[j]
+                percentage = (value / column_totals[column]) * 100
+                text = f'{value}\n({percentage:.1f}%)'
+                ax.text(bar_x, bar_height, text, ha='center', va='bottom', fontsize=fontsize_auto)
+
+        if meta['i_type'] == 'Count' :          
+            if meta['target'] is not None:
+               ax.axhline(y=meta['target'], color='red', linestyle='--', linewidth=0.5, label='Target')
+            if meta['baseline'] is not None:
+                ax.axhline(y=meta['baseline'], color='blue', linestyle='--', linewidth=0.5, label='Baseline')
+            if meta['midline'] is not None:
+                ax.axhline(y=meta['midline'], color='green', linestyle='--', linewidth=0.5,  label='Midline')
+
+        ax.set_title(title, fontsize=fontsize + 4)
+        ax.set_xlabel(" ", fontsize=fontsize)
+        ax.set_ylabel("Count", fontsize = fontsize)
+        df.index = category_labels(df.index)
+        labels = [''.join(label) if isinstance(label, tuple) else label for label in df.index]
+        labels = [replace_spaces(label) for label in labels]
+        ax.set_xticklabels(labels, rotation=rotation, fontsize=fontsize)
+        ax.legend(title=f'{breakdown} and Target', fontsize=fontsize-1)
+        max_height = df.max().max()
+        ax.set_ylim(0, max_height * 1.1)
+        ax.yaxis.set_major_locator(MaxNLocator(integer=True))
+        fig.savefig(output_file, bbox_inches='tight' if tight else None, dpi=dpi)
+
+def breakdown_percentage_bar(meta, df, colname, file_path, figsize=(12, 8), rotation=0, fontsize=12, reuse=False,
+        dpi=800, file_format='png', tight=True, batch=False):
+    """
+    - To generate bar plots through the breakdown data (Percentage only)
+    meta: dict, Indicator details needed for the chart (chart_meta)
+    df: Dataframe, Disaggregated dataframe
+    colname: str, Reference column for the breakdown
+    file_path: str, Directory where plots will be saved
+    figsize: tuple, Size of plots
+    rotation: int, Rotation angle for the x-axis ticks
+    fontsize: int, Font size for plots
+    reuse: bool, Draw on a reused figure instead of a new one (chart_figure)
+    dpi: int, Resolution of the saved plot
+    file_format: str, File format of the saved plot ('png', 'svg', etc)
+    tight: bool, Crop the saved plot to its content (draws the plot twice)
+    batch: bool, Draw outside pyplot's figure manager (chart_figure)
+    """      
+    breakdown = meta['breakdown'][colname]
+    palette = [bodhi_complement, bodhi_blue, bodhi_tertiary, bodhi_primary_1, bodhi_grey, bodhi_secondary]
+    if meta['var_order'] != None:
+        df = df.loc[meta['var_order']]
+    with chart_figure(figsize, reuse, batch) as (fig, ax):
+        df.plot(kind='bar', stacked=False, width=0.6, color=palette, ax=ax)
+        title = f'{meta["description"]}\nby {breakdown}'
+        output_file = f'{file_path}_{meta["indicator_name"]}_{breakdown}_percent.{file_format}'
+    
+        ax.set_ylabel('Percentage')
+        ax.set_title(title)
+        bar_width = ax.patches[0].get_width()
+        fontsize_auto = max(fontsize * (bar_width / 0.85), 8)
+        for i in ax.containers:
+            ax.bar_label(i, labels=[f'{p:.0f}%' for p in df[i.get_label()]], label_type='edge', fontsize=fontsize_auto)
+        
+        if meta['i_type'] == 'Percentage' :          
+            if meta['target'] is not None:
+               ax.axhline(y=meta['target'], color='red', linestyle='--', linewidth=0.5, label='Target')
+            if meta['baseline'] is not None:
+                ax.axhline(y=meta['baseline'], color='blue', linestyle='--', linewidth=0.5, label='Baseline')
+            if meta['midline'] is not None:
+                ax.axhline(y=meta['midline'], color='green', linestyle='--', linewidth=0.5,  label='Midline')
+
+        ax.set_title(title, fontsize=fontsize + 4)
+        ax.set_xlabel(" ", fontsize=fontsize)
+        ax.set_ylabel("Percentage", fontsize = fontsize)
+        ax.set_ylim(0, 105)
+        ax.set_yticks([0, 20, 40, 60, 80, 100])
+        df.index = category_labels(df.index)
+        labels = [''.join(label) if isinstance(label, tuple) else label for label in df.index]
+        labels = [replace_spaces(label) for label in labels]
+        ax.set_xticklabels(labels, rotation=rotation, fontsize=fontsize)
+        for label in ax.get_xticklabels():
+            label.set(rotation=rotation, fontsize=fontsize)
+        ax.legend(title=f'{breakdown} and Target', fontsize=fontsize-1)
+        fig.savefig(output_file, bbox_inches='tight' if tight else None, dpi=dpi)
+
+def plot_bar(meta, df_, file_path, figsize=(12, 8), rotation=0, fontsize=12, reuse=False,
+        dpi=800, file_format='png', tight=True, batch=False):
+    """
+    - To generate bar plot for overall information
+    meta: dict, Indicator details needed for the chart (chart_meta)
+    df_: Dataframe, Dataframe
+    file_path: str, Directory where a bar plot will be saved
+    figsize: tuple, Size of plots
+    rotation: int, Rotation angle for the x-axis ticks
+    fontsize: int, Font size for plots
+    reuse: bool, Draw on a reused figure instead of a new one (chart_figure)
+    dpi: int, Resolution of the saved plot
+    file_format: str, File format of the saved plot ('png', 'svg', etc)
+    tight: bool, Crop the saved plot to its content (draws the plot twice)
+    batch: bool, Draw outside pyplot's figure manager (chart_figure)
+    """      
+    from matplotlib.ticker import MaxNLocator
+    from matplotlib.patches import Patch
+    title = meta['description']
+    output_file = f'{file_path}_{meta["indicator_name"]}.{file_format}'
+    palette = [bodhi_complement, bodhi_blue, bodhi_tertiary, bodhi_primary_1, bodhi_grey, bodhi_secondary]
+    if meta['var_order'] != None:
+        df_ = df_.loc[meta['var_order']]        
+    with chart_figure(figsize, reuse, batch) as (fig, ax):
+        if meta['i_type'] == 'Count':
+            df2 = df_['Count']
+            df2.plot(kind='bar', color=palette, ax = ax)
+            bars = ax.patches
+            total = df_['Count'].values.sum()
+            for bar in bars:
+                height = bar.get_height()
+                percentage = (height / total) * 100
+                ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height(), 
+                     f'{height:.0f} ({percentage:.1f}%)',
+                     ha='center', va='bottom', fontsize=fontsize+2)
+            max_height = df_.max().max()
+            ax.yaxis.set_major_locator(MaxNLocator(integer=True))
+            ax.set_ylim(0, max_height * 1.1)
+        
+        elif meta['i_type'] == 'Percentage':
+            df_['Percentage'].plot(kind='bar', color=palette, ax = ax)
+            bars = ax.patches
+            for bar, (idx, row) in zip(bars, df_.iterrows()):
+                percentage = row['Percentage']
+                count = row['Count']
+                label = f'{percentage:.1f}% ({int(count)})'
+                ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height(), label,ha='center', va='bottom', fontsize=fontsize + 2)
+            ax.set_ylim(0, 105)
+            ax.set_yticks([0, 20, 40, 60, 80, 100])
+
+        if meta['target'] is not None:
+            ax.axhline(y=meta['target'], color='red', linestyle='--', linewidth=0.5, label='Target')
+        
+        if meta['baseline'] is not None:
+            ax.axhline(y=meta['baseline'], color='blue', linestyle='--', linewidth=0.5, label='Baseline')
+        
+        if meta['midline'] is not None:
+            ax.axhline(y=meta['midline'], color='green', linestyle='--', linewidth=0.5,  label='Midline')
+        
+        df_.index = category_labels(df_.index)
+        labels = [''.join(label) if isinstance(label, tuple) else label for label in df_.index]
+        labels = [replace_spaces(label) for label in labels]
+        ax.set_title(title, fontsize=fontsize + 4)
+        ax.set_xlabel(" ", fontsize=fontsize)
+        ax.set_ylabel(meta['i_type'], fontsize = fontsize)
+        ax.set_xticks(range(len(labels)))
+        ax.set_xticklabels(labels, rotation=rotation, fontsize=fontsize)
+        bar_handles = [Patch(color=color, label=label) for color, label in zip(cycle(palette), labels)]
+        line_handles, _ = ax.get_legend_handles_labels()
+        handles = bar_handles + line_handles[:-1]
+        ax.legend(handles=handles, title="Category", loc='best')
+        fig.savefig(output_file, bbox_inches='tight' if tight else None, dpi=dpi)
+
+def render_job(job, reuse=False, profile='report', batch=False):
+    """
+    - To render a single chart job
+    job: dict, Chart job (chart_job)
+    reuse: bool, Draw on a reused figure instead of a new one (chart_figure)
+    profile: str, Render quality profile (render_profiles)
+    batch: bool, Draw outside pyplot's figure manager (chart_figure)
+    """
+    dpi = render_profiles[profile]['dpi']
+    file_format = render_profiles[profile]['format']
+    tight = render_profiles[profile]['tight']
+    if job['kind'] == 'count':
+        breakdown_count_bar(job['meta'], job['df'], job['colname'], job['folder'], reuse=reuse, dpi=dpi, file_format=file_format, tight=tight, batch=batch)
+    elif job['kind'] == 'percentage':
+        breakdown_percentage_bar(job['meta'], job['df'], job['colname'], job['folder'], reuse=reuse, dpi=dpi, file_format=file_format, tight=tight, batch=batch)
+    elif job['kind'] == 'overall':
+        plot_bar(job['meta'], job['df'], job['folder'], reuse=reuse, dpi=dpi, file_format=file_format, tight=tight, batch=batch)
+    if not reuse:
+        # One full collection per chart at 800 dpi (245 MB buffer), one per ~70 charts at 72 dpi
+        global uncollected
+        uncollected += int(12 * dpi) * int(8 * dpi) * 4
+        if uncollected >= collect_limit:
+            gc.collect()
+            uncollected = 0
+    return f"{job['output']}.{file_format}"
+
+def render_charts(jobs, max_workers=None, reuse=False, profile='report', batch=False):
+    """
+    - To render chart jobs in a pool of worker processes
+    - A failed chart is reported and the other charts are still rendered
+    jobs: list, Chart jobs (chart_job)
+    max_workers: int, Number of worker processes (None: all cores, 1: render in this process)
+    reuse: bool, Each process draws on one reused figure per size instead of a new figure per chart
+    profile: str, Render quality profile (render_profiles)
+    batch: bool, Render with the Agg backend outside pyplot's figure manager, in this process and in every worker (batch_backend)
+    """
+    failures = []
+    if not render_profiles[profile]['charts']:
+        print(f"Charts are skipped ('{profile}' profile)")
+        return failures
+    if len(jobs) == 0:
+        return failures
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    file_format = render_profiles[profile]['format']
+
+    if max_workers == 1:
+        if batch:
+            batch_backend()
+        for job in jobs:
+            try:
+                render_job(job, reuse, profile, batch)
+            except Exception as e:
+                failures.append((f"{job['output']}.{file_format}", f'{type(e).__name__}: {e}'))
+        # The buffers left since the last collection are released once the whole batch has been rendered
+        global uncollected
+        gc.collect()
+        uncollected = 0
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=batch_backend if batch else None) as executor:
+            futures = {executor.submit(render_job, job, reuse, profile, batch): job for job in jobs}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    failures.append((f"{futures[future]['output']}.{file_format}", f'{type(e).__name__}: {e}'))
+
+    print(f'{len(jobs) - len(failures)} of {len(jobs)} charts have been rendered')
+    for output_file, error in failures:
+        print(f'Chart could not be rendered: {output_file} | {error}')
+    return failures
@@ -6,65 +6,69 @@ Created on Tue Sep 17 15:04:49 2024
 @author: Bodhi Global Analysis (Jungyeon Lee)
 """
 
+import os
+import copy
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.ticker import MaxNLocator
-from matplotlib.patches import Patch
-from matplotlib.lines import Line2D
-import seaborn as sns
-from pandas.plotting import table
-from IPython.display import clear_output
 import warnings
-from openpyxl import load_workbook
-from openpyxl.utils.dataframe import dataframe_to_rows
-from openpyxl.styles import Font
-from statsmodels.stats.outliers_influence import variance_inflation_factor
-from statsmodels.tools.tools import add_constant
-from scipy.stats import normaltest
-from statsmodels.stats.diagnostic import lilliefors
-import statsmodels.api as sm
-from scipy import stats
-from scipy.stats import f_oneway
-from itertools import cycle
-from statsmodels.formula.api import ols
+import pongamia_charts as ch
+import pongamia_scoring as sc
+import pongamia_dataset as ds
+import pongamia_workbook as wbk
+import pongamia_significance as sg
+from concurrent.futures import ProcessPoolExecutor
 
 warnings.filterwarnings("ignore")
-plt.rcParams['figure.dpi'] = 600
-
-bodhi_blue = (0.0745, 0.220, 0.396)
-bodhi_grey = (0.247, 0.29, 0.322)
-bodhi_primary_1 = (0.239, 0.38, 0.553)
-bodhi_secondary = (0.133, 0.098, 0.42)
-bodhi_tertiary = (0.047, 0.396, 0.298)
-bodhi_complement = (0.604, 0.396, 0.071)
 
 class Data_analysis:
 
-    def __init__(self, name, indicators):
+    def __init__(self, name, indicators, data=None):
         """
         - Initialise the data analysis class
 
         name: str, Name of the project
         indicators: list, List of the project indicators
+        data: Dataset_context, Dataset shared by the indicators (pongamia_dataset)
         """
         self.name = name
         self.indicators = indicators
+        self.data = data
+        self.chart_jobs = []
+        self.cache = None # Analysis_cache of the outputs of unchanged indicators (pongamia_cache)
+        self.significance = False # Test every breakdown block (chi-square or ANOVA, pongamia_significance)
+        self.weights = None # Column of the design weights (None: every respondent counts once)
 
-    def count(self, df, var, index_name):
+    def count(self, df, var, index_name, weights=None):
         """
         - To generate a table showing the count and percentage of the indicator
         df: Dataframe, Dataframe of this project
         var: list, Variables related to the indicator
         index_name: str, Index name for the new count dataframe
+        weights: array, Design weights of the rows (None: every respondent counts once)
+        -> Weighted counts, with the effective sample size and the design effect of each answer
         """
         count = df[var].value_counts()
+        if weights is not None:
+            # Rows are matched to the answers of the unweighted table, then counted with weighted bincounts
+            keys = pd.MultiIndex.from_frame(df[var]) if isinstance(count.index, pd.MultiIndex) else df[var]
+            codes = count.index.get_indexer(keys)
+            valid = codes >= 0
+            totals = np.bincount(codes[valid], weights=weights[valid], minlength=len(count))
+            squares = np.bincount(codes[valid], weights=weights[valid] ** 2, minlength=len(count))
+            effective, deff = ds.design_effect(totals, squares, count.to_numpy())
+            count_df = pd.DataFrame({'Count': np.round(totals, 2)}, index=count.index)
+            count_df['Percentage'] = round(count_df['Count'] / count_df['Count'].sum() * 100, 1)
+            count_df['Effective sample size'] = effective
+            count_df['Design effect'] = deff
+            count_df = count_df.iloc[np.argsort(-totals, kind='stable')]
+            count_df.index.name = index_name
+            return count_df
         count_df = pd.DataFrame({'Count': count})
         count_df['Percentage'] = round(count_df['Count'] / count_df['Count'].sum() * 100, 1)
         count_df.index.name = index_name
         return count_df
 
-    def multi_table(self, df, columns, categories, column_labels, index_name, change = None):
+    def multi_table(self, df, columns, categories, column_labels, index_name, change = None, weights = None):
         """
         - To generate a multi-table showing the count and percentage of the indicator
         df: Dataframe, Dataframe of this project
@@ -73,37 +77,83 @@ class Data_analysis:
         columns_labels: list, Labels of the columns
         index_name: str, Name of the dataframe
         change: list, New indices
+        weights: array, Design weights of the rows (None: every respondent counts once)
+        -> Weighted counts, with the effective sample size and the design effect of each column
         """
-        table = pd.DataFrame(index=categories)
-        for col in columns:
-            table[col] = df[col].value_counts().reindex(categories, fill_value=0)
+        table = self.multi_counts(df, columns, categories, weights)
+        design = None
+        if weights is not None:
+            squares = self.multi_counts(df, columns, categories, weights ** 2)
+            respondents = self.multi_counts(df, columns, categories)
+            effective, deff = ds.design_effect(table.sum(axis=0), squares.sum(axis=0), respondents.sum(axis=0))
+            design = pd.DataFrame([effective, deff], index=['Effective sample size', 'Design effect'])
+            table = table.round(2)
         if column_labels is not None:
             table.columns = column_labels
         if change is not None:
             table.index = change[:len(table)]
         column_sums = table.sum(axis=0)
         percentage_table = table.div(column_sums, axis=1) * 100
+        percentage_table.index = pd.Index([f'{idx}(%)' for idx in table.index], name=table.index.name)
+        if design is not None:
+            design.columns = table.columns
+            return pd.concat([table, percentage_table, design])
+        return pd.concat([table, percentage_table])
 
-        for i, idx in enumerate(table.index):
-            table.loc[f'{idx}(%)'] = percentage_table.loc[idx]
-        return table
+    def multi_counts(self, df, columns, categories, weights=None):
+        """
+        - To count the answers of a block of multi-response columns into one count matrix (np.bincount per column)
+        df: Dataframe, Dataframe of this project
+        columns: list, Variables related to the indicator
+        categories: list, Categories of the indices
+        weights: array, Design weights of the rows (None: every respondent counts once)
+        """
+        if categories is None:
+            # Without declared categories the rows are the answers of the first column, as value_counts gives them
+            table = pd.DataFrame(index=categories)
+            for col in columns:
+                table[col] = df[col].value_counts().reindex(categories, fill_value=0)
+            if weights is not None:
+                for col in columns:
+                    codes = table.index.get_indexer(df[col])
+                    valid = codes >= 0
+                    table[col] = np.bincount(codes[valid], weights=weights[valid], minlength=len(table))
+            return table
+        index = pd.Index(categories)
+        # Row 0: missing or undeclared answers
+        counts = np.zeros((len(categories) + 1, len(columns)), dtype=np.int64 if weights is None else float)
+        for i, col in enumerate(columns):
+            values = df[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                # Category codes are counted first, then moved to the rows of their declared answers
+                lookup = index.get_indexer(values.cat.categories) + 1
+                category_counts = np.bincount(values.cat.codes.to_numpy() + 1, weights=weights, minlength=len(lookup) + 1)[1:]
+                np.add.at(counts[:, i], lookup, category_counts)
+            else:
+                codes = np.where(values.isna(), -1, index.get_indexer(values))
+                counts[:, i] = np.bincount(codes + 1, weights=weights, minlength=len(categories) + 1)
+        return pd.DataFrame(counts[1:], index=categories, columns=columns)
 
-    def tables(self, indicator, var, sheet_name, var_name, file_path, folder):
+    def tables(self, indicator, var, sheet_name, var_name, book, folder):
         """
         - To generate tables including both general and breakdown data and related plots
         indicator: indicator class, Indicator from indicator class (bodhi_indicator)
         var: list, Variables related to the indicator or question
         sheet_name: str, Excel sheet name for data analysis outputs
         var_name: str, Name of the question
-        file_path: str, Directory where tables files will be saved
+        book: Workbook_session, Workbook session collecting the tables (pongamia_workbook)
         folder: str, Folder where plots will be saved
         """
-        df = indicator.df
+        df = self.data.frame(indicator.columns(), indicator.mask)
         if indicator.breakdown != None:
             dis_cols = list(indicator.breakdown.keys())
         else: dis_cols = None
         dfs = {}
-        book = load_workbook(file_path)  
+
+        # Nominal categoricals (pongamia_schema) only show the answers found in this data, like text columns
+        for col in (var if isinstance(var, list) else [var]) + (dis_cols or []):
+            if col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype) and not df[col].cat.ordered:
+                df[col] = df[col].cat.remove_unused_categories()
 
         try:
             if indicator.var_order is not None:
@@ -112,65 +162,105 @@ class Data_analysis:
                     df[var_] = df[var_].cat.set_categories(indicator.var_order, ordered=True)
         except (KeyError, ValueError) as e:
             print("")
+
+        # Design weights of the rows of this table (None: every respondent counts once)
+        weights = self.data.row_weights(self.weights, indicator.mask) if self.weights is not None else None
             
         if indicator.var_type == 'single':
-            overall_df = self.count(df, var, index_name=indicator.indicator_name)
-            if indicator.kap_label == None:
-                self.plot_bar(indicator, overall_df, folder)
-            elif len(indicator.kap_label) < 7:
-                self.plot_bar(indicator, overall_df, folder)
+            overall_df = self.count(df, var, index_name=indicator.indicator_name, weights=weights)
+            if indicator.kap_label == None or len(indicator.kap_label) < 7:
+                self.chart_jobs.append(ch.chart_job('overall', indicator, overall_df, folder))
+                # The charts label the categories as flat text, the tables use the same labels
+                if indicator.var_order == None:
+                    overall_df.index = ch.category_labels(overall_df.index)
                 
         elif indicator.var_type == 'multi':
             if indicator.var_change != None:
                 change = list(indicator.var_change.values())
-                overall_df = self.multi_table(indicator.df, indicator.var, 
-                          categories = indicator.var_order, column_labels = indicator.kap_label, index_name = var_name, change=change)
+                overall_df = self.multi_table(df, indicator.var, 
+                          categories = indicator.var_order, column_labels = indicator.kap_label, index_name = var_name, change=change, weights=weights)
             else:
-                overall_df = self.multi_table(indicator.df, indicator.var, 
-                      categories = indicator.var_order, column_labels = indicator.kap_label, index_name = var_name)
+                overall_df = self.multi_table(df, indicator.var, 
+                      categories = indicator.var_order, column_labels = indicator.kap_label, index_name = var_name, weights=weights)
                 
         if dis_cols != None:
-            melted = df.melt(id_vars=dis_cols, value_vars=var, var_name=' ', value_name='category_value')
+            # A single variable is counted straight from its column, several variables are stacked in one column (same as melt)
+            var_cols = var if isinstance(var, list) else [var]
+            answers = df[var_cols[0]] if len(var_cols) == 1 else pd.concat([df[var_] for var_ in var_cols], ignore_index=True)
+            answers = ds.factorise(answers)
+            answer_weights = np.tile(weights, len(var_cols)) if weights is not None else None
+            counts, groupings = [], []
             for col, i in zip(dis_cols, range(len(dis_cols))):
-                count_df = melted.groupby(['category_value', col]).size().unstack(fill_value=0)
+                codes, levels, categorical = self.data.group_codes(col, indicator.mask)
+                groupings.append(codes)
+                if len(var_cols) > 1:
+                    codes = np.tile(codes, len(var_cols))
+                group = (codes, levels, categorical)
+                count_df = ds.crosstab(answers, group, column_name=col, weights=answer_weights)
+                if weights is not None:
+                    # Same cells counted with squared weights and without weights, for the design effect of each group
+                    squares = ds.crosstab(answers, group, weights=answer_weights ** 2).to_numpy()
+                    respondents = ds.crosstab(answers, group).to_numpy()
+                    effective, deff = ds.design_effect(count_df.sum(axis=0), squares.sum(axis=0), respondents.sum(axis=0))
+                    design = pd.DataFrame([effective, deff], index=['Effective sample size', 'Design effect'], columns=count_df.columns)
+                    # The chi-square test uses the weighted table scaled to its effective sample size (sum of weights / Deff)
+                    scale = count_df.to_numpy().sum() / squares.sum() if squares.sum() > 0 else 0
+                    counts.append(count_df.to_numpy() * scale)
+                else:
+                    counts.append(count_df.to_numpy())
                 if indicator.var_type != 'multi':
-                    self.breakdown_count_bar(indicator, count_df, col, folder)
+                    self.chart_jobs.append(ch.chart_job('count', indicator, count_df, folder, col))
+                    if indicator.var_order == None:
+                        count_df.index = ch.category_labels(count_df.index)
                 percent_df = round(count_df.div(count_df.sum(axis=0), axis=1) * 100, 2)
                 if indicator.var_type != 'multi':
-                    self.breakdown_percentage_bar(indicator, percent_df, col, folder)
+                    self.chart_jobs.append(ch.chart_job('percentage', indicator, percent_df, folder, col))
                 f_df = pd.concat([count_df, percent_df.add_suffix('(%)')], axis=1)
+                if weights is not None:
+                    f_df = pd.concat([f_df.round(2), pd.concat([design, design.add_suffix('(%)')], axis=1)])
                 breakdown = indicator.breakdown[col]
                 dfs[f'{breakdown}'] = f_df.transpose()
                       
             final_df = pd.concat(dfs, axis=0)
             if indicator.var_change != None:
                 final_df.rename(columns=indicator.var_change, inplace=True)
+            if self.significance:
+                labels = [indicator.breakdown[col] for col in dis_cols]
+                significance_df = self.significance_tests(indicator, df, var_cols, labels, counts, groupings, weights)
             
-        with pd.ExcelWriter(file_path, engine='openpyxl', mode='a', if_sheet_exists='overlay') as writer:
-            if dis_cols != None:
-                final_df.to_excel(writer, sheet_name=sheet_name, merge_cells=False, index=True, header=True)
-                startrow = final_df.shape[0] + 2
-                overall_df.to_excel(writer, sheet_name=sheet_name, startrow=startrow, index=True, header=True)
-            else: overall_df.to_excel(writer, sheet_name=sheet_name, index=True, header=True)
-                
-        wb = load_workbook(file_path)
-        ws = wb[sheet_name]
-        ws.insert_rows(1)
-        ws['B1'] = indicator.description
-        ws['B1'].font = Font(bold=True)
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if cell.value:
-                        max_length = max(max_length, len(str(cell.value)))
-                except:
-                    pass
-            adjusted_width = (max_length + 2)
-            ws.column_dimensions[column_letter].width = adjusted_width
-    
-        wb.save(file_path)
+        book.add_sheet(sheet_name, indicator.description)
+        if dis_cols != None:
+            book.add_block(sheet_name, final_df, merge_cells=False, index=True, header=True)
+            if self.significance:
+                # Next to the breakdown block, after one empty column
+                startcol = final_df.index.nlevels + final_df.shape[1] + 1
+                book.add_block(sheet_name, significance_df, startcol=startcol, index=True, header=True)
+            startrow = final_df.shape[0] + 2
+            book.add_block(sheet_name, overall_df, startrow=startrow, index=True, header=True)
+        else: book.add_block(sheet_name, overall_df, index=True, header=True)
+
+    def significance_tests(self, indicator, df, var_cols, labels, counts, groupings, weights=None):
+        """
+        - To test every breakdown of a table at once (one batched test for all breakdowns)
+        -> Scores (Indicator.add_numeric): ANOVA of the values across the groups of each breakdown (weighted with the design weights)
+        -> Other variables: Chi-square test of independence of the count tables
+           (declared answers, multiple responses and coded answers such as 0/1 columns, whatever their dtype)
+        indicator: indicator class, Indicator from indicator class (bodhi_indicator)
+        df: Dataframe, Rows and columns of the table (Dataset_context.frame)
+        var_cols: list, Variables of the table
+        labels: list, Names of the breakdowns
+        counts: list, Count tables of the breakdowns (answers x groups)
+        groupings: list, Group codes of the rows for each breakdown (Dataset_context.group_codes)
+        weights: array, Design weights of the rows (None: every respondent counts once)
+        """
+        values = df[var_cols[0]]
+        score = indicator.numeric and indicator.var_type == 'single' and indicator.var_order is None and indicator.var_change is None
+        if score and len(var_cols) == 1 and pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            statistic, df_between, df_within, p_value = sg.anova(values.to_numpy(dtype=float), groupings, weights)
+            dof = [f'{between}, {within}' for between, within in zip(df_between, df_within)]
+            return sg.significance_table(labels, 'ANOVA', statistic, dof, p_value)
+        statistic, dof, p_value = sg.chi_square(counts)
+        return sg.significance_table(labels, 'Chi-square', statistic, dof, p_value)
 
     def calculation(self, indicator, method):
         """
@@ -191,23 +281,24 @@ class Data_analysis:
                 9. 'score_select_anyno': Check if at least one of the related columns was answered with "No"
                 10. 'score_select_manual': Manual Code for multiple selecting
         """
-        df = indicator.df
+        df = self.data.df
         variable = indicator.name
 
-        if method == "score":
-            if indicator.score_map != None:
-                df['score'] = df[indicator.var].map(indicator.score_map)
-                df[variable] = df['score'].apply(lambda x: 'Pass' if x >= indicator.valid_point else 'Not Pass')
-                df.drop(columns=['score'], inplace = True)
-            else: df[variable] = df[indicator.var].apply(lambda x: 'Pass' if x >= indicator.valid_point else 'Not Pass')
+        if method in ["score_average", "score_sum"] and indicator.score_map == None:
+            print("Please assign the score map for calculation")
+
+        elif method in sc.score_methods:
+            key = (method, indicator.var, indicator.score_map, indicator.valid_point)
+            values = self.data.result(key, indicator.var, lambda: sc.pass_status(df, method, indicator.var, indicator.score_map, indicator.valid_point))
+            self.data.add_column(variable, values, indicator.mask)
 
         elif method == "divide":
-            df = df.dropna(subset=indicator.var)
+            # Data points without a value are left out of this indicator
+            indicator.mask = self.data.mask(indicator.condition, indicator.var)
             
             def apply_valid_points(df, var, valid_points):
                 if var[0] not in df.columns:
                     raise KeyError(f"Column '{var}' does not exist in the dataframe.")
-                df = df.dropna(subset=var)
                 int_keys = [key for key in valid_points.keys() if isinstance(key, int)]
                 tuple_keys = [key for key in valid_points.keys() if isinstance(key, tuple)]
                 sorted_int_keys = sorted(int_keys)
@@ -230,94 +321,25 @@ class Data_analysis:
                 if len(choices) < len(conditions):
                     choices.append(' ')
     
-                df[variable] = np.select(conditions, choices, default=' ')
-                return df
-
-            df = apply_valid_points(df, indicator.var, indicator.valid_point)
-            
-        elif method == "score_average":
-            if indicator.score_map != None:
-                def scoring(row):
-                    score = 0
-                    columns = indicator.var
-                    for col in columns:
-                        value = row[col]
-                        score += indicator.score_map.get(value, 0)
-                    return score / len(columns)
-                df['score'] = df.apply(scoring, axis=1)
-                df[variable] = df['score'].apply(lambda x: 'Pass' if x >= indicator.valid_point else 'Not Pass')
-                df.drop(columns=['score'], inplace = True)
-            else: print("Please assign the score map for calculation")
-
-        elif method == "score_sum":
-            if indicator.score_map != None:
-                def scoring(row):
-                    score = 0
-                    columns = indicator.var
-                    for col in columns:
-                        score += indicator.score_map.get(row[col], 0)
-                    return score
-                df['score'] = df.apply(scoring, axis=1)
-                df[variable] = df['score'].apply(lambda x: 'Pass' if x >= indicator.valid_point else 'Not Pass')
-                df.drop(columns=['score'], inplace = True)
-            else: print("Please assign the score map for calculation")
+                return np.select(conditions, choices, default=' ')
 
+            key = (method, indicator.var, indicator.valid_point)
+            values = self.data.result(key, indicator.var, lambda: apply_valid_points(df, indicator.var, indicator.valid_point))
+            self.data.add_column(variable, values, indicator.mask)
             
-        elif method == "score_select_allyes":
-            df['response'] = df.apply(lambda row: all(row[var] == 'Yes' for var in indicator.var), axis=1)
-            df[variable] = df['response'].apply(lambda x: 'Pass' if x else 'Not Pass')
-            df.drop(columns=['response'], inplace = True)
-
-        elif method == "score_select_allno":
-            df['response'] = df.apply(lambda row: all(row[var] == 'No' for var in indicator.var), axis=1)
-            df[variable] = df['response'].apply(lambda x: 'Pass' if x else 'Not Pass')
-            df.drop(columns=['response'], inplace = True)
-
-        elif method == "score_select_anyyes":
-            df['response'] = df.apply(lambda row: any(row[var] == 'Yes' for var in indicator.var), axis=1)
-            df[variable] = df['response'].apply(lambda x: 'Pass' if x else 'Not Pass')
-            df.drop(columns=['response'], inplace = True)
-
-        elif method == "score_select_anyno":
-            df['response'] = df.apply(lambda row: any(row[var] == 'No' for var in indicator.var), axis=1)
-            df[variable] = df['response'].apply(lambda x: 'Pass' if x else 'Not Pass')
-            df.drop(columns=['response'], inplace = True)
-
-        elif method == "score_select_manual":
-            def scoring(row):
-                score = 0
-                for col in ['col1', 'col2', 'col3', 'col4']:
-                    if row[col] == 'Yes': # Assign and adjust the response for +1 score
-                        score += 1 # Please adjust this score
-                    elif row[col] == 'No': # Assign the response for -1 score
-                        score -= 1 # Please adjust this score
-                for col in ['col5', 'col6']: # Assign the response for +1 score
-                    if row[col] == 'No':
-                        score += 1 # Please adjust this score
-                return score
-            df['score'] = df.apply(scoring, axis=1)
-            df[variable] = df['score'].apply(lambda x: 'Pass' if x >= indicator.valid_point else 'Not Pass')
-            df.drop(columns=['score'], inplace = True)        
-        
         indicator.var = variable
-        indicator.df = df
         indicator.var_type = 'single'
             
         if indicator.var_change is not None:
-            df[variable] = df[variable].replace(indicator.var_change)
+            self.data.add_column(variable, self.data.df[variable].replace(indicator.var_change), indicator.mask)
             
     def indicator_analysis(self):
         """
         - To run the calculation function for all indicators
         """         
         for indicator in self.indicators:
-            if indicator.condition is None:
-                df_copy = indicator.df
-            else:
-                df_copy = indicator.df
-                df_copy = df_copy[indicator.condition]
-            
-            indicator.df = df_copy
+            # Rows of the shared dataset used by this indicator (boolean array)
+            indicator.mask = self.data.mask(indicator.condition)
             if indicator.i_cal != None:
                 self.calculation(indicator, indicator.i_cal)
         return print("All indicators have been calculated")
@@ -332,63 +354,8 @@ class Data_analysis:
         figsize: tuple, Size of plots
         rotation: int, Rotation angle for the x-axis ticks
         fontsize: int, Font size for plots
-        """         
-        breakdown = indicator.breakdown[colname]
-        palette = [bodhi_complement, bodhi_blue, bodhi_tertiary, bodhi_primary_1, bodhi_grey, bodhi_secondary]
-        if indicator.var_order != None:
-            df = df.loc[indicator.var_order]
-        ax = df.plot(kind='bar', stacked=False, width=0.6, figsize=figsize, color=palette)
-        title = f'{indicator.description}\nby {breakdown}'
-        output_file = f'{file_path}_{indicator.indicator_name}_{breakdown}_count.png'
-        
-        ax.set_ylabel('Count')
-        ax.set_title(title)
-        column_totals = df.sum(axis=0)
-        
-        bar_width = ax.patches[0].get_width()
-        fontsize_auto = max(fontsize * (bar_width / 0.85), 8)
-        
-        for i, column in enumerate(df.columns):
-            for j in range(len(df)):
-                bar_index = i * len(df) + j
-                bar = ax.patches[bar_index]
-                bar_x = bar.get_x() + bar.get_width() / 2
-                bar_height = bar.get_height()
-                value = df[column].iloc[j]
-                percentage = (value / column_totals[column]) * 100
-                text = f'{value}\n({percentage:.1f}%)'
-                ax.text(bar_x, bar_height, text, ha='center', va='bottom', fontsize=fontsize_auto)
-
-        if indicator.i_type == 'Count' :          
-            if indicator.target is not None:
-               ax.axhline(y=indicator.target, color='red', linestyle='--', linewidth=0.5, label='Target')
-            if indicator.baseline is not None:
-                ax.axhline(y=indicator.baseline, color='blue', linestyle='--', linewidth=0.5, label='Baseline')
-            if indicator.midline is not None:
-                ax.axhline(y=indicator.midline, color='green', linestyle='--', linewidth=0.5,  label='Midline')
-
-        def replace_spaces(text):
-            delimiters = [' ', '/']
-            if len(text) >= 10:
-                spaces = [i for i, char in enumerate(text) if char in delimiters]
-                if len(spaces) >= 3:
-                    text = text[:spaces[0]] + '\n' + text[spaces[0]+1:spaces[2]] + '\n' + text[spaces[2]+1:]
-                elif len(spaces) >= 1:
-                    text = text[:spaces[0]] + '\n' + text[spaces[0]+1:]
-            return text
-        
-        plt.title(title, fontsize=fontsize + 4)
-        plt.xlabel(" ", fontsize=fontsize)
-        plt.ylabel("Count", fontsize = fontsize)
-        df.index = df.index.map(lambda x: x if isinstance(x, str) else ''.join(map(str, x)) if hasattr(x, '__iter__') else str(x))
-        labels = [''.join(label) if isinstance(label, tuple) else label for label in df.index]
-        labels = [replace_spaces(label) for label in labels]
-        ax.set_xticklabels(labels, rotation=rotation, fontsize=fontsize)
-        plt.legend(title=f'{breakdown} and Target', fontsize=fontsize-1)
-        max_height = df.max().max()
-        plt.ylim(0, max_height * 1.1)
-        ax.yaxis.set_major_locator(MaxNLocator(integer=True))
-        plt.savefig(output_file, bbox_inches='tight', dpi=800)
+        """
+        ch.breakdown_count_bar(ch.chart_meta(indicator), df, colname, file_path, figsize, rotation, fontsize)
 
     def breakdown_percentage_bar(self, indicator, df, colname, file_path, figsize=(12, 8), rotation=0, fontsize=12):
         """
@@ -400,52 +367,8 @@ class Data_analysis:
         figsize: tuple, Size of plots
         rotation: int, Rotation angle for the x-axis ticks
         fontsize: int, Font size for plots
-        """      
-        breakdown = indicator.breakdown[colname]
-        palette = [bodhi_complement, bodhi_blue, bodhi_tertiary, bodhi_primary_1, bodhi_grey, bodhi_secondary]
-        if indicator.var_order != None:
-            df = df.loc[indicator.var_order]
-        ax = df.plot(kind='bar', stacked=False, width=0.6, figsize=figsize, color=palette)
-        title = f'{indicator.description}\nby {breakdown}'
-        output_file = f'{file_path}_{indicator.indicator_name}_{breakdown}_percent.png'
-        
-        ax.set_ylabel('Percentage')
-        ax.set_title(title)
-        bar_width = ax.patches[0].get_width()
-        fontsize_auto = max(fontsize * (bar_width / 0.85), 8)
-        for i in ax.containers:
-            ax.bar_label(i, labels=[f'{p:.0f}%' for p in df[i.get_label()]], label_type='edge', fontsize=fontsize_auto)
-            
-        if indicator.i_type == 'Percentage' :          
-            if indicator.target is not None:
-               ax.axhline(y=indicator.target, color='red', linestyle='--', linewidth=0.5, label='Target')
-            if indicator.baseline is not None:
-                ax.axhline(y=indicator.baseline, color='blue', linestyle='--', linewidth=0.5, label='Baseline')
-            if indicator.midline is not None:
-                ax.axhline(y=indicator.midline, color='green', linestyle='--', linewidth=0.5,  label='Midline')
-                
-        def replace_spaces(text):
-            delimiters = [' ', '/']
-            if len(text) >= 10:
-                spaces = [i for i, char in enumerate(text) if char in delimiters]
-                if len(spaces) >= 3:
-                    text = text[:spaces[0]] + '\n' + text[spaces[0]+1:spaces[2]] + '\n' + text[spaces[2]+1:]
-                elif len(spaces) >= 1:
-                    text = text[:spaces[0]] + '\n' + text[spaces[0]+1:]
-            return text
-    
-        plt.title(title, fontsize=fontsize + 4)
-        plt.xlabel(" ", fontsize=fontsize)
-        plt.ylabel("Percentage", fontsize = fontsize)
-        plt.ylim(0, 105)
-        plt.yticks([0, 20, 40, 60, 80, 100])
-        df.index = df.index.map(lambda x: x if isinstance(x, str) else ''.join(map(str, x)) if hasattr(x, '__iter__') else str(x))
-        labels = [''.join(label) if isinstance(label, tuple) else label for label in df.index]
-        labels = [replace_spaces(label) for label in labels]
-        ax.set_xticklabels(labels, rotation=rotation, fontsize=fontsize)
-        plt.xticks(rotation=rotation, fontsize=fontsize)
-        plt.legend(title=f'{breakdown} and Target', fontsize=fontsize-1)
-        plt.savefig(output_file, bbox_inches='tight', dpi=800)
+        """
+        ch.breakdown_percentage_bar(ch.chart_meta(indicator), df, colname, file_path, figsize, rotation, fontsize)
 
     def plot_bar(self, indicator, df_, file_path, figsize=(12, 8), rotation=0, fontsize=12):
         """
@@ -456,89 +379,133 @@ class Data_analysis:
         figsize: tuple, Size of plots
         rotation: int, Rotation angle for the x-axis ticks
         fontsize: int, Font size for plots
-        """      
-        title = indicator.description
-        output_file = f'{file_path}_{indicator.indicator_name}.png'
-        palette = [bodhi_complement, bodhi_blue, bodhi_tertiary, bodhi_primary_1, bodhi_grey, bodhi_secondary]
-        if indicator.var_order != None:
-            df_ = df_.loc[indicator.var_order]        
-        fig, ax = plt.subplots(figsize=figsize)
-        if indicator.i_type == 'Count':
-            df2 = df_['Count']
-            df2.plot(kind='bar', color=palette, figsize=figsize, ax = ax)
-            bars = ax.patches
-            total = df_['Count'].values.sum()
-            for bar in bars:
-                height = bar.get_height()
-                percentage = (height / total) * 100
-                ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height(), 
-                     f'{height:.0f} ({percentage:.1f}%)',
-                     ha='center', va='bottom', fontsize=fontsize+2)
-            max_height = df_.max().max()
-            ax.yaxis.set_major_locator(MaxNLocator(integer=True))
-            plt.ylim(0, max_height * 1.1)
-            
-        elif indicator.i_type == 'Percentage':
-            df_['Percentage'].plot(kind='bar', color=palette, figsize=figsize, ax = ax)
-            bars = ax.patches
-            for bar, (idx, row) in zip(bars, df_.iterrows()):
-                percentage = row['Percentage']
-                count = row['Count']
-                label = f'{percentage:.1f}% ({int(count)})'
-                ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height(), label,ha='center', va='bottom', fontsize=fontsize + 2)
-            plt.ylim(0, 105)
-            plt.yticks([0, 20, 40, 60, 80, 100])
-
-        if indicator.target is not None:
-            ax.axhline(y=indicator.target, color='red', linestyle='--', linewidth=0.5, label='Target')
-            
-        if indicator.baseline is not None:
-            ax.axhline(y=indicator.baseline, color='blue', linestyle='--', linewidth=0.5, label='Baseline')
-            
-        if indicator.midline is not None:
-            ax.axhline(y=indicator.midline, color='green', linestyle='--', linewidth=0.5,  label='Midline')
-            
-        df_.index = df_.index.map(lambda x: x if isinstance(x, str) else ''.join(map(str, x)) if hasattr(x, '__iter__') else str(x))
-        labels = [''.join(label) if isinstance(label, tuple) else label for label in df_.index]
+        """
+        ch.plot_bar(ch.chart_meta(indicator), df_, file_path, figsize, rotation, fontsize)
 
-        def replace_spaces(text):
-            delimiters = [' ', '/']
-            if len(text) >= 10:
-                spaces = [i for i, char in enumerate(text) if char in delimiters]
-                if len(spaces) >= 3:
-                    text = text[:spaces[0]] + '\n' + text[spaces[0]+1:spaces[2]] + '\n' + text[spaces[2]+1:]
-                elif len(spaces) >= 1:
-                    text = text[:spaces[0]] + '\n' + text[spaces[0]+1:]
-            return text
+    def render_charts(self, max_workers=None, reuse=False, profile='report', batch=False):
+        """
+        - To render all the charts queued by the tables function
+        max_workers: int, Number of worker processes (None: all cores, 1: render in this process)
+        reuse: bool, Each process draws on one reused figure per size instead of a new figure per chart
+        profile: str, Render quality profile ('report', 'draft', 'vector' or 'tables')
+        batch: bool, Render with the Agg backend and the Figure API, without pyplot (pongamia_charts.chart_figure)
+        """
+        jobs = self.chart_jobs
+        self.chart_jobs = []
+        # Plots of cached indicators are only rendered again when the file is missing
+        file_format = ch.render_profiles[profile]['format']
+        fresh = [job for job in jobs if not (job.get('cached') and os.path.exists(f"{job['output']}.{file_format}"))]
+        if len(fresh) != len(jobs):
+            print(f'{len(jobs) - len(fresh)} charts of unchanged indicators have been reused')
+        return ch.render_charts(fresh, max_workers, reuse, profile, batch)
 
-        labels = [replace_spaces(label) for label in labels]
-        plt.title(title, fontsize=fontsize + 4)
-        plt.xlabel(" ", fontsize=fontsize)
-        plt.ylabel(indicator.i_type, fontsize = fontsize)
-        ax.set_xticks(range(len(labels)))
-        ax.set_xticklabels(labels, rotation=rotation, fontsize=fontsize)
-        bar_handles = [Patch(color=color, label=label) for color, label in zip(cycle(palette), labels)]
-        line_handles, _ = ax.get_legend_handles_labels()
-        handles = bar_handles + line_handles[:-1]
-        ax.legend(handles=handles, title="Category", loc='best')
-        plt.savefig(output_file, bbox_inches='tight', dpi=800)   
+    def cached_analysis(self, indicator):
+        """
+        - To look up the tables and charts of an indicator in the cache (used when its definition and data have not changed)
+        -> Returns the cache key and the cached outputs (None: not in the cache or no cache)
+        indicator: indicator class, Indicator from indicator class (bodhi_indicator)
+        """
+        if self.cache is None:
+            return None, None
+        columns = indicator.columns() + ([self.weights] if self.weights is not None else [])
+        key = self.cache.key(indicator, self.data.frame(columns, indicator.mask))
+        return key, self.cache.get(key)
         
-    def evaluation(self, file_path, folder):
+    def indicator_tables(self, indicator, book, folder):
+        """
+        - To generate the tables (one sheet per variable of a multi indicator) and queue the charts of one indicator
+        indicator: indicator class, Indicator from indicator class (bodhi_indicator)
+        book: Workbook_session, Workbook session collecting the tables (pongamia_workbook)
+        folder: str, Folder where plots will be saved
+        """
+        if indicator.var_type == 'single':
+           sheet_name = f"{indicator.indicator_name}"
+           var_name = f"{indicator.number}" 
+           self.tables(indicator, indicator.var, sheet_name, var_name, book, folder)
+        elif indicator.var_type == 'multi':
+            names = range(len(indicator.var))
+            for var, i in zip(indicator.var, names):
+                sheet_name = f"{indicator.indicator_name}-{i}"
+                var_name = f"{indicator.number}-{i}"
+                self.tables(indicator, var, sheet_name, var_name, book, folder)
+
+    def evaluation(self, book, folder, max_workers=1):
         """
         - Function to run the kap_tables function for each indicator or question
-        file_path: str, Directory where tables files will be saved
+        book: Workbook_session, Workbook session collecting the tables (pongamia_workbook)
         folder: str, Folder where plots will be saved
+        max_workers: int, Number of processes building the tables (None: all cores, 1: no worker processes)
+        -> Workers send back the tables and chart jobs of their indicators, the workbook is only written by this process
         """
-        for indicator in self.indicators:
-            print(f'{indicator.name} analysis starts')
-            if indicator.var_type == 'single':
-               sheet_name = f"{indicator.indicator_name}"
-               var_name = f"{indicator.number}" 
-               self.tables(indicator, indicator.var, sheet_name, var_name, file_path, folder)
-            elif indicator.var_type == 'multi':
-                names = range(len(indicator.var))
-                for var, i in zip(indicator.var, names):
-                    sheet_name = f"{indicator.indicator_name}-{i}"
-                    var_name = f"{indicator.number}-{i}"
-                    self.tables(indicator, var, sheet_name, var_name, file_path, folder)
-                    
\ No newline at end of file
+        lookups = [(indicator,) + self.cached_analysis(indicator) for indicator in self.indicators]
+        pending = [worker_indicator(indicator) for indicator, key, entry in lookups if entry is None] if max_workers != 1 else []
+        executor = None
+        if len(pending) != 0:
+            max_workers = min(max_workers or os.cpu_count() or 1, len(pending))
+            executor = ProcessPoolExecutor(max_workers=max_workers, initializer=start_worker,
+                                           initargs=(self.name, self.data, self.significance, self.weights))
+            # Results come back in the order of the indicators, so the sheets keep the same order as without workers
+            results = executor.map(worker_tables, pending, [folder] * len(pending))
+        try:
+            for indicator, key, entry in lookups:
+                if entry is not None:
+                    print(f'{indicator.name} has not changed, the cached tables are used')
+                    book.replay(entry['sheets'])
+                    self.chart_jobs += [dict(job, cached=True) for job in entry['charts']]
+                    continue
+                if executor is not None:
+                    records, jobs = next(results)
+                    print(f'{indicator.name} analysis has finished')
+                    book.replay(records)
+                    self.chart_jobs += jobs
+                else:
+                    print(f'{indicator.name} analysis starts')
+                    book.start_record()
+                    n_jobs = len(self.chart_jobs)
+                    self.indicator_tables(indicator, book, folder)
+                    records, jobs = book.stop_record(), self.chart_jobs[n_jobs:]
+                if key is not None:
+                    self.cache.put(key, {'sheets': records, 'charts': jobs})
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return True
+
+# Analysis tool of a worker process (start_worker), the dataset is sent once per worker
+worker_tool = None
+
+def start_worker(name, data, significance=False, weights=None):
+    """
+    - To prepare a worker process building indicator tables
+    name: str, Name of the project
+    data: Dataset_context, Dataset shared by the indicators (pongamia_dataset)
+    significance: bool, Test every breakdown block (Data_analysis.significance)
+    weights: str, Column of the design weights (Data_analysis.weights)
+    """
+    global worker_tool
+    worker_tool = Data_analysis(name, [], data)
+    worker_tool.significance = significance
+    worker_tool.weights = weights
+
+def worker_indicator(indicator):
+    """
+    - Copy of an indicator to send to a worker process (its rows are kept as a mask, the condition is not needed)
+    indicator: indicator class, Indicator from indicator class (bodhi_indicator)
+    """
+    indicator = copy.copy(indicator)
+    indicator.df = None
+    indicator.condition = None
+    return indicator
+
+def worker_tables(indicator, folder):
+    """
+    - To build the tables of one indicator in a worker process
+    -> Returns the recorded sheets and the chart jobs of the indicator
+    indicator: indicator class, Indicator from indicator class (bodhi_indicator)
+    folder: str, Folder where plots will be saved
+    """
+    book = wbk.Workbook_session(None, first_sheet=None)
+    book.start_record()
+    worker_tool.chart_jobs = []
+    worker_tool.indicator_tables(indicator, book, folder)
+    return book.stop_record(), worker_tool.chart_jobs
@@ -12,17 +12,90 @@ Please download following Python Libraries:
 2. Numpy
 3. uuid
 4. openpyxl
+5. pyarrow (optional, for the columnar copy of the cleaned dataset)
 """
 
 import pandas as pd
 import numpy as np
+import os
 import uuid
 from openpyxl import load_workbook
+import pongamia_builders as bld
+import pongamia_schema as sc
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+    feather = None
+
+def columnar_copy(df):
+    """
+    - To prepare a dataframe for the columnar (Feather) file
+    -> Object columns mixing numbers and text are stored as text (missing values are kept)
+    df: Dataframe, Dataframe of this project
+    """
+    df = df.copy()
+    df.columns = [str(col) for col in df.columns]
+    for col in df.columns[df.dtypes == object]:
+        try:
+            pa.array(df[col], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+def compact_dtypes(df):
+    """
+    - To store integer columns with the smallest safe integer type (int32 when every value fits)
+    df: Dataframe, Dataframe of this project
+    """
+    limits = np.iinfo(np.int32)
+    for col in df.columns[df.dtypes == np.int64]:
+        if df[col].empty or (df[col].min() >= limits.min and df[col].max() <= limits.max):
+            df[col] = df[col].astype(np.int32)
+    return df
+
+def save_columnar(df, file_path):
+    """
+    - To save a typed columnar copy (Feather) next to the dataset, categoricals included
+    df: Dataframe, Dataframe of this project
+    file_path: str, Directory of the dataset without the extension
+    """
+    if feather is None:
+        print("pyarrow is not installed, the columnar copy of the dataset has not been saved")
+        return False
+    feather.write_feather(columnar_copy(df), f"{file_path}.feather")
+    print(f"The columnar copy has been saved: {file_path}.feather")
+    return True
+
+def load_cleaned_data(file_path, columns=None, schema=None):
+    """
+    - To load the cleaned dataset, from its columnar copy when the copy is newer than the xlsx/csv file
+    -> The columnar copy keeps the dtypes of the preprocessing, the xlsx/csv file is converted with the schema
+       (without pyarrow, or when the xlsx/csv file has been changed after the copy was saved)
+    file_path: str, Directory of the cleaned dataset (xlsx, xls or csv)
+    columns: list, Columns to load (None: all columns), e.g. PerformanceManagementFramework.required_columns()
+    schema: dic, Column -> (type, answers) of the preprocessing (see pongamia_schema, None: keep the types read from the file)
+    """
+    cache = f"{os.path.splitext(file_path)[0]}.feather"
+    usecols = None
+    if columns is not None:
+        wanted = set(columns)
+        usecols = lambda col: col in wanted
+    if feather is not None and os.path.exists(cache) and os.path.getmtime(cache) >= os.path.getmtime(file_path):
+        table = feather.read_table(cache, memory_map=True)
+        if columns is not None: # Columns that are not selected are never read from the memory-mapped file
+            table = table.select([col for col in table.column_names if col in wanted])
+        return table.to_pandas()
+    if file_path.endswith('.csv'):
+        df = pd.read_csv(file_path, usecols=usecols)
+    else: df = pd.read_excel(file_path, usecols=usecols)
+    return sc.apply_schema(df, schema)
 
 class Preprocessing:
     
     def __init__(self, name, file_path, file_path_others, list_del_cols, dates, miss_col, anon_col, anon_col2, identifiers, opened_cols, cols_new, regions
-                 ,locations, age_col = None, diss_cols = None, del_type = 0, file_type='xlsx'):
+                 ,locations, age_col = None, diss_cols = None, del_type = 0, file_type='xlsx', sri_table = None, poverty_lines = None, chunksize = None, schema = None):
         """
         - Initialise the Performance Management Framework class
 
@@ -44,6 +117,11 @@ class Preprocessing:
         -> 1: First, remove columns where missing values make up 10% or more of the total data points
               Then, remove all remaining missing values from the columns where they are detected
         file_type: str, filetype of the raw dataset
+        sri_table: dic, Self-reliance Index scoring table (None: pongamia_builders.sri_table)
+        poverty_lines: dic, Country -> (PPP line, exchange rate, days) for the national poverty line (None: pongamia_builders.poverty_lines)
+        chunksize: int, Number of rows read at a time from a csv file (None: read the whole file at once)
+        -> Each chunk is renamed and reduced to the columns needed downstream (pilot dates are removed after the duplicate check)
+        schema: dic, Column -> (type, answers) applied when the dataset is loaded (see pongamia_schema)
         """
         self.name = name
         self.file_path = file_path
@@ -62,6 +140,10 @@ class Preprocessing:
         self.age_col = age_col
         self.diss_cols = diss_cols
         self.del_type = del_type
+        self.sri_table = sri_table if sri_table is not None else bld.sri_table
+        self.poverty_lines = poverty_lines if poverty_lines is not None else bld.poverty_lines
+        self.chunksize = chunksize
+        self.schema = schema
         self.df = None
     
     def data_load(self):
@@ -75,6 +157,8 @@ class Preprocessing:
             self.df = df
             return True
         elif file_type == 'csv':
+            if self.chunksize is not None:
+                return self.chunked_load()
             df = pd.read_csv(f"{file_path}.{file_type}")
             self.df = df
             return True
@@ -82,12 +166,51 @@ class Preprocessing:
             print("Please use 'xlsx', 'xls' or 'csv' file")
             return False
         
+    def chunked(self):
+        """
+        - Whether the raw csv file is read chunk by chunk
+        """
+        return self.file_type == 'csv' and self.chunksize is not None
+
+    def chunked_load(self):
+        """
+        - To load a large csv file chunk by chunk, so that the peak memory depends on the chunk size
+        -> Renaming, dtype schema and column deletion are applied to every chunk
+        -> Pilot dates are removed after the duplicate check (date_filter), as for a whole-file read: a pilot submission
+           sharing its identifier with a later one removes that later submission
+        -> Open-ended answers are kept as categoricals until they are extracted (open_ended_cols)
+        """
+        # Deleted columns that are still needed for the duplicate check, anonymisation, pilot dates and missing values are removed later
+        later_cols = set(self.identifiers) | set(self.miss_col) | {self.anon_col, self.anon_col2, 'today'}
+        drop_cols = [col for col in self.list_del_cols if col not in later_cols]
+        original_cols = None
+        chunks = []
+        for chunk in pd.read_csv(f"{self.file_path}.{self.file_type}", chunksize=self.chunksize):
+            if original_cols is None:
+                original_cols = list(chunk.columns)
+            chunk.columns = self.cols_new
+            chunk = chunk.drop(columns=drop_cols)
+            chunk = sc.apply_schema(chunk, self.schema)
+            for col in self.opened_cols:
+                chunk[col] = sc.categorical(chunk[col])
+            chunks.append(compact_dtypes(chunk))
+        if original_cols is None:
+            print("The csv file is empty")
+            return False
+
+        df = sc.concat_chunks(chunks, self.schema)
+        del chunks
+        self.columns_book(original_cols)
+        print(f'Number of columns: {len(df.columns)} | After loading the csv file in chunks of {self.chunksize} rows')
+        self.df = df
+        return True
+
     def delete_columns(self):
         """
         - To drop unnecessary columns
         """
         df = self.df
-        list_cols = self.list_del_cols
+        list_cols = [col for col in self.list_del_cols if col in df.columns] # Chunked loading has already removed most of them
         df = df.drop(columns = list_cols)
         print(f'Number of columns: {len(df.columns)} | After removing the columns that are not needed for the analysis')
         self.df = df
@@ -151,12 +274,14 @@ class Preprocessing:
         if file_type == 'xlsx' or file_type == 'xls':
             df.reset_index(drop=True, inplace = True)
             df.to_excel(f"{file_path}.{file_type}", index=False)
+            save_columnar(df, file_path)
             self.df = df
             print("The revised dataset has been saved")
             return True
         elif file_type == 'csv':
             df.reset_index(drop=True, inplace = True)
             df.to_csv(f"{file_path}.{file_type}", index=False)
+            save_columnar(df, file_path)
             self.df = df
             print("The revised dataset has been saved")
             return True
@@ -257,11 +382,19 @@ class Preprocessing:
         - To change column names for smoother data analysis
         """
         df = self.df
+        original_cols = list(df.columns)
+        df.columns = self.cols_new
+        self.columns_book(original_cols)
+        self.df = sc.apply_schema(df, self.schema)
+        return True
+
+    def columns_book(self, original_cols):
+        """
+        - To save the new and original column names
+        original_cols: list, Column names of the raw dataset
+        """
         new_cols = self.cols_new
         file_path = f'{self.file_path}_columns_book.xlsx'
-        original_cols = list(df.columns)
-        df.columns = new_cols
-    
         with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
             empty_df = pd.DataFrame()
             empty_df.to_excel(writer, sheet_name='basic', index=False)
@@ -279,7 +412,6 @@ class Preprocessing:
                 worksheet.column_dimensions[col[0].column_letter].width = adjusted_width
 
         print(f"Column information has been saved: {file_path}")
-        self.df = df
         return True
 
     def age_group(self):
@@ -303,25 +435,7 @@ class Preprocessing:
         df = self.df
         cols = self.diss_cols
         try:
-            df['WG-Disability'] = ''
-            
-            def wg_ss(row, cols):
-                values = row[cols]
-                some_difficulty_count = (values == 'Some difficulty').sum()
-                a_lot_of_difficulty = (values == 'A lot of difficulty').any() or (values == 'Cannot do at all').any()
-                cannot_do_at_all = (values == 'Cannot do at all').any()
-                if cannot_do_at_all:
-                    return 'DISABILITY4'
-                elif a_lot_of_difficulty:
-                    return 'DISABILITY3'
-                elif some_difficulty_count >= 2:
-                    return 'DISABILITY2'
-                elif some_difficulty_count >= 1:
-                    return 'DISABILITY1'
-                else:
-                    return 'No_disability'
-            df['WG-Disability'] = df.apply(lambda row: wg_ss(row, cols), axis=1)
-            df['Disability'] = df['WG-Disability'].apply(lambda x: 'Disability' if x in ['DISABILITY4', 'DISABILITY3'] else 'No Disability')
+            df = bld.disability_wgss(df, cols)
             print('New disability variable (Disability) has been created in this dataset (Based on WG-SS)')
             self.df = df
             return True
@@ -332,19 +446,7 @@ class Preprocessing:
         """
         - To calculate % of displacement-affected persons living below the national poverty line
         """
-        df = self.df
-        def assign_poverty_status(row):
-            if row['4'] == 'Sudan':
-                threshold = round(2.15 * 30 * 601.5 * row['8'], 0)
-            elif row['4'] == 'South Sudan':
-                threshold = round(2.15 * 30 * 130.26 * row['8'], 0)
-            else:
-                return np.nan
-        
-            return 'Poverty' if row['10'] < threshold else 'Not poverty'
-
-        df['National poverty'] = df.apply(assign_poverty_status, axis=1)
-        self.df = df
+        self.df = bld.poverty(self.df, self.poverty_lines)
         
     def decent_work(self):
         """
@@ -358,202 +460,19 @@ class Preprocessing:
         """
         - To calculate the Self-reliance Index score
         """
-        df = self.df
-        condition1a = [
-            (df['26'] == 'No shelter'),
-            (df['26'] == 'Makeshift shelter (shack, kiosk, vehicle)/Shelter not fit for safe habitation'),
-            (df['26'] == 'Temporarily hosted by friends, family, community/faith group, or emergency shelter'),
-            (df['26'] == 'Traditional hut, inadequate'),
-            (df['26'] == 'Traditional hut, adequate')]
-        
-        condition1b = [
-            (df['28'] == '2-3 times'),
-            (df['28'] == '1 time'),
-            (df['28'] == 'None'),
-            (df['28'] == 'Not applicable')]
-        
-        condition2 = [
-            (df['29'] == 'Household did not eat yesterday'),
-            (df['29'] == 'Household was able to eat, but not even a full meal'),
-            (df['29'] == 'Household was able to eat 1 full meal'),
-            (df['29'] == 'Household was able to eat 2-3 full meals')]
-        
-        condition3 = [
-            (df['30'] == 'No school-aged children in household'),
-            (df['30'] == 'None are in school'),
-            (df['30'] == 'Some are in school'),
-            (df['30'] == 'All are in school')]
-        
-        condition4 = [
-            (df['31'] == 'Have not needed health care in last 3 months'),
-            (df['31'] == 'Did not receive the needed health care'),
-            (df['31'] == 'Received some of the needed health care'),
-            (df['31'] == 'Received all of the needed health care')]
-        
-        condition5 = [
-            (df['32'] == 'Adult(s) in household has health condition that interferes with adult employment'),
-            (df['32'] == 'Dependent(s) in household has health condition that interferes with adult employment'),
-            (df['32'] == 'None of the above')]
-        
-        condition7 = [
-            (df['35'] == 'No employment'),
-            (df['35'] == 'Temporary, irregular, seasonal'),
-            (df['35'] == 'Regular part-time (including self-employment)'),
-            (df['35'] == 'Full-time (including self-employment), without necessary legal documentation'),
-            (df['35'] == 'Full-time (including self-employment), with legal documentation'),]
-        
-        condition8 = [
-            (df['36-7'] == 1) & (df[['36-1', '36-2', '36-3', '36-4', '36-5', '36-6']].sum(axis=1) == 0),  # 35-7 is 1, and all other columns are 0
-            (df['36-6'] == 1) & (df[['36-1', '36-2', '36-3', '36-4', '36-5', '36-7']].sum(axis=1) == 0),  # 35-6 is 1, and all other columns are 0
-            (df['36-6'] == 1) & ((df[['36-1', '36-2', '36-3', '36-4', '36-5', '36-7']].sum(axis=1) > 0)),  # 35-6 is 1, and any other column is 1
-            (df['36-7'] == 0) & (df['36-6'] == 0)]
-        
-        condition11 = [
-            (df['39'] == 'No, no savings or saleable assets'),
-            (df['39'] == 'Yes, but not enough to cover one month’s expenses (basic needs)'),
-            (df['39'] == 'Yes, enough to cover one month’s expenses (basic needs)'),
-            (df['39'] == 'Yes, enough to cover one month’s expenses (basic needs) plus enough to purchase an asset, or reinvest into one’s business, or to sustain a moderate health crisis')]
-
-        condition12a = [
-            (df['40'] == 'Knows no one who could lend money'),
-            (df['40'] == 'Knows someone/ has community support that could lend money')]
-        
-        condition12b = [
-            (df['41'] == 'Neither'),
-            (df['41'] == 'Household members ask others for advice/information ONLY'),
-            (df['41'] == 'People ask household members for advice/information ONLY)'),
-            (df['41'] == 'Both of them')]
-        
-        values1a = [1, 2, 3, 4, 5]
-        values1b = [1, 3, 5, 0]
-        values2 = [1, 2, 3, 5]
-        values3 = [0, 1, 3, 5]
-        values4 = [0, 1, 3, 5]
-        values5 = [1, 3, 5]
-        values7 = [1, 2, 3, 4, 5]
-        values8 = [3, 5, 3, 1]
-        values11 = [1, 3, 4, 5]
-        values12a = [1, 5]
-        values12b = [1, 3, 3, 5]
-        df['sri_1a'] = np.select(condition1a, values1a, default=np.nan)
-        df['sri_1b'] = np.select(condition1b, values1b, default=np.nan)
-        df['sri_2'] = np.select(condition2, values2, default=np.nan)
-        df['sri_3'] = np.select(condition3, values3, default=np.nan)
-        df['sri_4'] = np.select(condition4, values4, default=np.nan)
-        df['sri_5'] = np.select(condition5, values5, default=np.nan)
-        df['sri_6'] = np.where(df['33-9'] == 1, 5, np.where(df['34'] == 'Yes', 1, 3))
-        df['sri_7'] = np.select(condition7, values7, default=np.nan)
-        df['sri_8'] = np.select(condition8, values8, default=np.nan)
-        df['sri_9'] = df[['37-2', '37-3', '37-4', '37-5', '37-6']].eq(1).sum(axis=1)
-        df['sri_9'] = df['sri_9'].map({3: 1, 4: 1, 5: 1, 2: 2, 1: 3})
-        df['sri_9'] = np.where(df['36-1'] == 1, 5, df['sri_9'])
-        df['sri_10'] = df[['38-2', '38-3', '38-4', '38-5', '38-6', '38-7']].eq(1).sum(axis=1)
-        df['sri_10'] = df['sri_10'].map({5: 1, 4: 1, 3: 2, 2: 2, 1: 3})
-        df['sri_10'] = np.where(df['38-1'] == 1, 5, df['sri_10'])
-        df['sri_11'] =np.select(condition11, values11, default=np.nan)
-        df['sri_12a'] =np.select(condition12a, values12a, default=np.nan)
-        df['sri_12b'] =np.select(condition12b, values12b, default=np.nan)
-        df['sri_12'] = df[['sri_12a', 'sri_12b']].mean(axis=1)
-        
-        columns_to_fill = ['sri_1a', 'sri_1b', 'sri_2','sri_3', 'sri_4', 'sri_5', 'sri_6', 'sri_9', 
-                   'sri_7', 'sri_8', 'sri_10', 'sri_11', 'sri_12']
-
-        df[columns_to_fill] = df[columns_to_fill].fillna(0)
-
-        df['sri'] = np.where(
-    df['sri_1b'] == 0, 
-    (df['sri_1a'] + df['sri_3'] + df['sri_4'] + df['sri_6'] + df['sri_7'] + df['sri_8'] + df['sri_10'] + df['sri_11'] + df['sri_12']) / 9 - (5 - df['sri_2']) * 0.15 - (3 - df['sri_5']) * 0.05 - (5 - df['sri_9']) * 0.2, 
-    (df['sri_1a'] + df['sri_1b'] + df['sri_3'] + df['sri_4'] + df['sri_6'] + df['sri_7'] + df['sri_8'] + df['sri_10'] + df['sri_11'] + df['sri_12']) / 10 - (5 - df['sri_2']) * 0.15 - (3 - df['sri_5']) * 0.05 - (5 - df['sri_9']) * 0.2)
-        df['sri'] = df['sri'].apply(lambda x: 1 if x < 1 else (5 if x > 5 else x))
-        self.df = df
+        self.df = bld.sri_index(self.df, self.sri_table)
 
     def output121(self):
         """
         - To calculate Output 1.2.1
         """
-        df = self.df
-        
-        source_conditions = ['Handpump or borehole', 'Protected shallow well', 'Protected dug well', 'Tube well', 'Tap stand']
-        df['dry_access_source'] = np.where(df['43'].isin(source_conditions), 1, 0)
-        df['rainy_access_source'] = np.where(df['55'].isin(source_conditions), 1, 0)
-    
-        df['dry_access_time'] = round((df['51'] * 2 + df['52']) / 30, 2)
-        df['rainy_access_time'] = round((df['63'] * 2 + df['64']) / 30, 2)
-        
-        df['dry_availability'] = np.where(df['44'] == 'Yes', 1, round(df['45'] / 7, 2))
-        df['rainy_availability'] = np.where(df['56'] == 'Yes', 1, round(df['57'] / 7, 2))
-        
-        df['dry_status'] = np.where(df['47'] == 'Yes', 1, np.nan)
-        df['rainy_status'] = np.where(df['59'] == 'Yes', 1, np.nan)
-        
-        status_mapping = {
-            'Minor repair': 0.67,
-            'Major repair': 0.33,
-            'It is beyond repair': 0}
-        
-        df['dry_status'] = df['dry_status'].fillna(df['48'].map(status_mapping))
-        df['rainy_status'] = df['dry_status'].fillna(df['60'].map(status_mapping))
-        
-        df['dry_animal'] = np.where(df['50'] == 'Yes', 0, 1)
-        df['rainy_animal'] = np.where(df['62'] == 'Yes', 0, 1)
-  
-        df['dry_fencing'] = np.where(df['49'] == 'Yes', 1, 0)
-        df['rainy_fencing'] = np.where(df['61'] == 'Yes', 1, 0)
-
-        quality_mapping = {
-            'Very Poor': 0,
-            'Poor': 0.25,
-            'Average': 0.5,
-            'Good': 0.75,
-            'Excellent': 1}
-        df['dry_quality'] = df['53'].map(quality_mapping)
-        df['rainy_quality'] = df['65'].map(quality_mapping)
-        
-        df['dry_access'] = df.apply(lambda row: 'Yes' if row['dry_access_source'] == 1 and row['dry_access_time'] <= 1 else 'No', axis=1)
-        df['rainy_access'] = df.apply(lambda row: 'Yes' if row['rainy_access_source'] == 1 and row['rainy_access_time'] <= 1 else 'No', axis=1)
-
-        def calculate_dry_score(row):
-            if row['dry_access'] == 'No':
-                return np.nan
-            else:
-                cols_to_avg = ['dry_access_time', 'dry_availability', 'dry_status', 'dry_animal', 'dry_fencing', 'dry_quality']
-                return row[cols_to_avg].mean()
-            
-        def calculate_rainy_score(row):
-            if row['rainy_access'] == 'No':
-                return np.nan
-            else:
-                cols_to_avg = ['rainy_access_time', 'rainy_availability', 'rainy_status', 'rainy_animal', 'rainy_fencing', 'rainy_quality']
-                return row[cols_to_avg].mean()
-        
-        df['dry_score'] = df.apply(calculate_dry_score, axis=1)
-        df['rainy_score'] = df.apply(calculate_rainy_score, axis=1)
-        
-        df['output_121'] = df.apply(lambda row: 'Improved' if row['dry_access'] =='Yes' and row['rainy_access'] =='Yes' else 'Not improved', axis=1)
-        df['output_121_score'] = np.where((df['dry_score'] != np.nan) & (df['rainy_score'] != np.nan),round((df['dry_score'] + df['rainy_score']) / 2),'No access')
-        self.df = df
+        self.df = bld.output121(self.df)
 
     def output122(self):
         """
         - To calculate Output 1.2.2
         """
-        df = self.df
-        conditions = ['Home latrine', 'Shared latrine', 'Communal latrine']
-        df['latrine_usage'] = np.where(df['73'].isin(conditions), 1, 0)
-        df['handwashing'] = np.where(df['78'] == 'Yes', 1, 0)
-        df['ownership'] = np.where(df['latrine_usage'] == 0,0,np.where(df['73'] == 'Home latrine', 1,
-        np.where(df['73'] == 'Shared latrine', 0.67,np.where(df['73'] == 'Communal latrine', 0.33, None))))
-        df['sanitation_accessibility'] = np.where(df['latrine_usage'] == 0,0,np.where(df['75'] == 'Yes', 1, 0))
-        df['sanitation_features'] = np.where(df['latrine_usage'] == 0,0, round(df[['74-1', '74-2', '74-3', '74-4']].sum(axis=1) / 4,2))
-        df['sanitation_safety'] = np.where(df['latrine_usage'] == 0,0,
-        (df[['79', '80', '81']].applymap(lambda x: 1 if x == 'Yes' else 0).sum(axis=1) +df['82'].map({'Agree': 1,'Neither agree nor disagree': 0.5,'Disagree': 0,'I do not use latrines': 0})) / 4)
-        df['sanitation_clean'] = np.where(df['latrine_usage'] == 0,0,np.where(df['76'].isin(['No', 'I do not use latrines']),0,
-                                                                              df['77'].map({'Daily': 1,'Weekly': 0.67}).fillna(0.33)))  
-        df['output_122'] = df.apply(lambda row: 'Improved' if row['latrine_usage'] + row['handwashing'] == 2 else 'Not improved', axis=1)  
-        df['output_122_score'] = np.where(df['output_122'] == 'No','No access',
-                                          df[['ownership', 'sanitation_accessibility', 'sanitation_features', 'sanitation_safety', 'sanitation_clean']].mean(axis=1))
-        
-        self.df = df
+        self.df = bld.output122(self.df)
   
     def output213(self):
         """
@@ -613,10 +532,9 @@ class Preprocessing:
     def unify(self):
         df = self.df
         for col in ['110','117','138','141']:
-            df[col].replace('Average', 'Moderate', inplace=True)
-        for col in ['130', '132', '134']:            
-            df[col].replace(' No', 'No', inplace=True)
-            df[col].replace(' Unsure', 'Unsure', inplace=True)
+            df[col] = sc.replace_answers(df[col], {'Average': 'Moderate'})
+        for col in ['130', '132', '134']:
+            df[col] = sc.replace_answers(df[col], {' No': 'No', ' Unsure': 'Unsure'})
             
         df['survey_type'] = np.where(df['0'] == 'Yes', 'Livelihoods', 'WASH')
         self.df = df
@@ -637,8 +555,10 @@ class Preprocessing:
         10. Create age and disability groups
         11. Save the cleaned dataset
         """
-        self.data_load()
-        self.columns_redefine()
+        if not self.data_load():
+            return False
+        if not self.chunked(): # Chunked loading renames the columns while reading
+            self.columns_redefine()
         print(f'Initial data points: {len(self.df)}')
         self.duplicates()
         self.data_anonymisation()
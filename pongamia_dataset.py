@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Jan 23 10:27:44 2025
+
+@author: Bodhi Global Analysis (Jungyeon Lee)
+"""
+
+import pandas as pd
+import numpy as np
+
+def level_index(levels, categorical, ordered=False):
+    """
+    - Index of the answers of a column (CategoricalIndex for categorical columns, like groupby)
+    levels: array, Answers of the column in table order
+    categorical: bool, Whether the column is categorical
+    ordered: bool, Whether the categories are ordered
+    """
+    if categorical:
+        return pd.CategoricalIndex(levels, categories=levels, ordered=ordered)
+    return pd.Index(levels)
+
+def factorise(series):
+    """
+    - To turn a column into integer codes (-1: missing value) and its answers in groupby order
+    series: Series, Column of the dataset
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories
+        return series.cat.codes.to_numpy(), level_index(categories, True, series.cat.ordered), True
+    codes, levels = pd.factorize(series, sort=True)
+    return codes, level_index(levels, False), False
+
+def crosstab(row, column, row_name='category_value', column_name=None, weights=None):
+    """
+    - To count every combination of answers and breakdown groups with one np.bincount
+    - Same table as df.groupby([row, column]).size().unstack(fill_value=0)
+    -> With a categorical column every answer of both columns is shown, otherwise only the observed combinations
+    -> With weights each respondent counts by its design weight (weighted bincount), the table keeps the same cells
+    row: tuple, (codes, levels, categorical) of the answers (factorise)
+    column: tuple, (codes, levels, categorical) of the breakdown column
+    row_name: str, Name of the table index
+    column_name: str, Name of the table columns
+    weights: array, Weight of each respondent, in the order of the codes (None: every respondent counts once)
+    """
+    row_codes, row_levels, row_cat = row
+    col_codes, col_levels, col_cat = column
+    n_rows, n_cols = len(row_levels), len(col_levels)
+    valid = (row_codes >= 0) & (col_codes >= 0)
+    combined = row_codes[valid].astype(np.int64) * n_cols + col_codes[valid]
+    counts = np.bincount(combined, minlength=n_rows * n_cols).reshape(n_rows, n_cols)
+    # The observed combinations are the answered ones, whatever their weights
+    observed = counts
+    if weights is not None:
+        counts = np.bincount(combined, weights=weights[valid], minlength=n_rows * n_cols).reshape(n_rows, n_cols)
+    if n_rows == 0 or n_cols == 0:
+        counts, row_levels, col_levels = counts[:0, :0], row_levels[:0], col_levels[:0]
+    elif not (row_cat or col_cat):
+        rows, cols = observed.sum(axis=1) > 0, observed.sum(axis=0) > 0
+        counts, observed = counts[rows][:, cols], observed[rows][:, cols]
+        row_levels, col_levels = row_levels[rows], col_levels[cols]
+        if counts.size and not cols.all():
+            # unstack() orders the groups by first appearance when a group has no answers, the tables keep that order
+            order = np.argsort(np.argmax(observed > 0, axis=0), kind='stable')
+            counts, col_levels = counts[:, order], col_levels[order]
+    table = pd.DataFrame(counts, index=row_levels, columns=col_levels)
+    table.index.name = row_name
+    table.columns.name = column_name
+    return table
+
+def design_effect(totals, squares, respondents):
+    """
+    - To calculate the effective sample size and the design effect of weighted counts (Kish)
+    -> Effective sample size: (sum of weights)^2 / sum of squared weights
+    -> Design effect: respondents / effective sample size
+    totals: array, Sum of the weights
+    squares: array, Sum of the squared weights
+    respondents: array, Number of respondents
+    """
+    totals, squares = np.asarray(totals, dtype=float), np.asarray(squares, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        effective = np.where(squares > 0, totals ** 2 / squares, np.nan)
+        deff = np.asarray(respondents, dtype=float) / effective
+    return np.round(effective, 1), np.round(deff, 3)
+
+class Dataset_context:
+
+    def __init__(self, df):
+        """
+        - Initialise the dataset shared by all indicators of a PMF
+        -> Indicators refer to its columns by name, derived columns are added to it once
+        -> Tables take only the rows and columns they need (frame), the shared dataset is never changed by a table
+
+        df: Dataframe, Dataframe of this project
+        """
+        self.df = df.copy(deep=False) # New columns are added to this frame only, not to the frame it was sliced from
+        self.derived = []
+        self.rows = None # Rows of the segment (segment), None: all rows
+        self.codes = {} # Column -> (codes, levels, categorical, ordered) of the whole dataset, shared by the segments
+        self.derived_codes = {} # Same for the derived columns of this dataset
+        self.results = {} # Calculations over the whole dataset, shared by the segments (result)
+
+    def segment(self, rows=None):
+        """
+        - Dataset of a segment of the rows (PMFs of a segmented run share one loaded dataset)
+        -> Same frame, factorised columns and calculations, the derived columns are kept per segment
+        rows: array, Boolean array of the rows in the segment (None: all rows)
+        """
+        data = Dataset_context(self.df)
+        data.rows = None if rows is None else np.asarray(rows, dtype=bool)
+        data.codes = self.codes
+        data.results = self.results
+        return data
+
+    def mask(self, condition=None, columns=None):
+        """
+        - Boolean array of the rows used by an indicator (None: all rows)
+        condition: Series or array, Filtering criteria for the indicator (Indicator.add_condition)
+        columns: list, Rows with missing values in these columns are left out
+        """
+        if condition is None and columns is None:
+            return None if self.rows is None else self.rows.copy()
+        mask = np.ones(len(self.df), dtype=bool) if self.rows is None else self.rows.copy()
+        if condition is not None:
+            if isinstance(condition, pd.Series):
+                condition = condition.reindex(self.df.index, fill_value=False)
+            mask &= np.asarray(condition, dtype=bool)
+        if columns is not None:
+            mask &= self.df[columns].notna().all(axis=1).to_numpy()
+        return mask
+
+    def add_column(self, name, values, mask=None):
+        """
+        - Add a derived column to the shared dataset (rows outside the mask are left empty)
+        name: str, Name of the new column
+        values: array, Values for every row of the dataset
+        mask: array, Rows where the values apply (None: all rows)
+        """
+        if mask is not None:
+            values = pd.Series(np.asarray(values).reshape(len(self.df)), index=self.df.index).where(mask)
+        self.df[name] = values
+        self.derived_codes.pop(name, None)
+        if name not in self.derived:
+            self.derived.append(name)
+
+    def frame(self, columns, mask=None):
+        """
+        - Small dataframe with the rows and columns used by one table
+        columns: list, Columns of the table
+        mask: array, Rows of the table (None: all rows)
+        """
+        columns = [col for col in columns if col in self.df.columns]
+        if mask is None:
+            return self.df[columns].copy()
+        return self.df.loc[mask, columns].copy()
+
+    def group_codes(self, col, mask=None):
+        """
+        - Integer codes of a breakdown column for the rows of a table (the column is factorised once and cached)
+        -> Answers that do not appear in these rows are left out, except for ordered categories
+        col: str, Breakdown column
+        mask: array, Rows of the table (None: all rows)
+        """
+        cache = self.derived_codes if col in self.derived else self.codes
+        if col not in cache:
+            codes, levels, categorical = factorise(self.df[col])
+            cache[col] = (codes, levels, categorical, categorical and self.df[col].cat.ordered)
+        codes, levels, categorical, ordered = cache[col]
+        if mask is not None:
+            codes = codes[mask]
+        if not ordered:
+            present = np.bincount(codes[codes >= 0], minlength=len(levels)) > 0
+            if not present.all():
+                new_codes = np.cumsum(present) - 1
+                codes = np.where(codes >= 0, new_codes[codes], -1)
+                levels = level_index(np.asarray(levels)[present], categorical)
+        return codes, levels, categorical
+
+    def row_weights(self, col, mask=None):
+        """
+        - Design weights of the rows of a table (respondents without a weight count as 0)
+        col: str, Column of the design weights
+        mask: array, Rows of the table (None: all rows)
+        """
+        weights = pd.to_numeric(self.df[col], errors='coerce').fillna(0).to_numpy(dtype=float)
+        return weights if mask is None else weights[mask]
+
+    def result(self, key, columns, calculate):
+        """
+        - Result of a calculation over every row of the dataset, calculated once for all segments
+        -> Calculations on derived columns are not shared (each segment has its own derived columns)
+        key: tuple, Settings of the calculation (method, variables, score map, valid point)
+        columns: list, Columns used by the calculation
+        calculate: function, Calculation returning one value per row of the dataset
+        """
+        columns = columns if isinstance(columns, list) else [columns]
+        if any(col in self.derived for col in columns):
+            return calculate()
+        key = repr(key)
+        if key not in self.results:
+            self.results[key] = calculate()
+        return self.results[key]
@@ -8,6 +8,7 @@ Created on Tue Sep 17 15:03:27 2024
 
 import pandas as pd
 import numpy as np
+import pongamia_scoring as sc
 
 
 class Indicator:
@@ -15,6 +16,7 @@ class Indicator:
     def __init__(self, df, name, number, var, i_cal, i_type, description, period, target):
         """
         - Initialise the Indicator class
+        df: Dataframe, Dataframe of this project (None: the PMF adds it later through add_data)
         name: str, Name of the indicator
         number: int, Number corresponding to the indicator
         var: list, Variables of the indicator (Questions)
@@ -48,7 +50,9 @@ class Indicator:
         self.valid_point = None
         self.breakdown = None
         self.condition = None
+        self.mask = None
         self.kap_label = None
+        self.numeric = False
 
     def info(self):
         """
@@ -60,6 +64,15 @@ class Indicator:
         if self.midline != None:
             print(f"This indicator's midline value was {self.midline}")
 
+    def columns(self):
+        """
+        - Columns of the dataset used by the indicator (variables, columns read by its scoring mode and breakdown columns)
+        """
+        var = self.var if isinstance(self.var, list) else [self.var]
+        scoring = sc.score_columns.get(self.i_cal, [])
+        breakdown = list(self.breakdown.keys()) if self.breakdown is not None else []
+        return list(dict.fromkeys(var + scoring + breakdown))
+
     def get_target(self):
         """
         - Get the target value
@@ -121,7 +134,7 @@ class Indicator:
     def add_condition(self, conditions):
         """
         - Add the condition for the indicator
-        conditions: series, Filtering criteria for the indicator: (df['2'] > 25) & (df['4'] == 'Male')
+        conditions: series or array, Filtering criteria for the indicator: (df['2'] > 25) & (df['4'] == 'Male')
         """
         self.condition = conditions
         
@@ -138,4 +151,11 @@ class Indicator:
         - Add the condition for column label change
         labels: list, New column labels for the multiple response questions in the survey
         """
-        self.kap_label = labels
\ No newline at end of file
+        self.kap_label = labels
+
+    def add_numeric(self):
+        """
+        - Mark the variable as a numeric score (e.g. 'sri'): its breakdowns are tested with an ANOVA of the scores
+        -> Other variables (answers, coded 0/1 or single-select answers, multiple responses) get a chi-square test
+        """
+        self.numeric = True
\ No newline at end of file
@@ -8,14 +8,16 @@ Created on Tue Sep 17 15:52:03 2024
 
 import pongamia_indicator as bd
 import pongamia_PMF as pmf
+import pongamia_workbook as wbk
+import pongamia_dataset as ds
+import pongamia_significance as sg
+import pongamia_data_preprocessing as dp
+from data_preprocessing import schema
 import pandas as pd
 
 """
 Evaluation
 """
-# Specify the file path for the clean dataset
-df = pd.read_excel('data/24-NEF-GLO-1 - Data_cleaned.xlsx')
-
 # Create indicators and provide additional details as needed (Evaluation)
 def create_indicators(df):
     indicators = []
@@ -215,39 +217,66 @@ def create_indicators_livelihood(df):
     return indicators
 
 # Extract the SRI scores by each category
-def sri_extraction(df, cols, output_file='data/sri_output.xlsx'):
-    with pd.ExcelWriter(output_file, engine='openpyxl', mode='w') as writer:
-        for col in cols:
-            grouped_df = df.groupby(col)['sri'].mean().reset_index()
-            grouped_df.to_excel(writer, sheet_name=col, index=False)       
+def sri_extraction(df, cols, output_file='data/sri_output.xlsx', write_only=False, significance=False):
+    book = wbk.Workbook_session(output_file, first_sheet=None, write_only=write_only)
+    if significance:
+        # One ANOVA of the SRI across the groups of every column, all columns tested at once
+        groupings = [ds.factorise(df[col])[0] for col in cols]
+        statistic, df_between, df_within, p_value = sg.anova(df['sri'].to_numpy(dtype=float), groupings)
+        dof = [f'{between}, {within}' for between, within in zip(df_between, df_within)]
+        tests = sg.significance_table(cols, 'ANOVA', statistic, dof, p_value)
+    for col in cols:
+        grouped_df = df.groupby(col)['sri'].mean().reset_index()
+        book.add_sheet(col, autofit=False)
+        book.add_block(col, grouped_df, index=False)
+        if significance:
+            book.add_block(col, tests.loc[[col]], startcol=grouped_df.shape[1] + 1, index=True)
+    book.save()
     return grouped_df
     
 
-df_wash = df[df['0'] == 'No']
-df_livelihood = df[df['0'] == 'Yes']
-# Create the PMF class ('Project Title', 'Evaluation')
-# Add the indicators to the PMF class
-pongamia_wash = pmf.PerformanceManagementFramework('WASH', 'Evaluation')
-indicators_wash = create_indicators_wash(df_wash)
-pongamia_wash.add_indicators(indicators_wash)
+# The charts are rendered in worker processes, the pipeline only runs when this file is executed
+if __name__ == '__main__':
+    # Render quality of the plots: 'report' (final report), 'draft' (quick check), 'vector' (SVG) or 'tables' (no plots)
+    profile = 'report'
+    # Folder of the analysis cache: indicators whose definition and data have not changed reuse their tables and plots (None: no cache)
+    # The cache files are pickles: keep this folder local, writable only by trusted users
+    cache = 'cache/'
+    # Number of processes building the indicator tables (None: all cores, 1: no worker processes)
+    max_workers = 1
+    # Batch run: the plots are drawn with the raster-only Agg backend, without an interactive backend or GUI toolkit
+    batch = True
+    # Test every breakdown (chi-square of the answers, ANOVA of numeric scores) and write the p-values next to its block
+    significance = True
+    # Column of the design weights of the stratified sample (None: every respondent counts once)
+    weights = None
+    # Draw every chart on one reused figure per size (same files, lower memory and no figure set-up per chart)
+    reuse = True
 
-file_path1 = 'data/24-NEF-GLO-1 - WASH Statistics.xlsx' # File path to save the statistics (including breakdown data)
-folder = 'visuals/wash/' # File path for saving visuals
-pongamia_wash.PMF_generation(file_path1, folder) # Run the PMF
+    # Create the PMF class ('Project Title', 'Evaluation')
+    # Add the indicators to the PMF class (the data is added once it has been loaded)
+    pongamia_wash = pmf.PerformanceManagementFramework('WASH', 'Evaluation', profile=profile, cache=cache, max_workers=max_workers, batch=batch, significance=significance, weights=weights, reuse=reuse)
+    pongamia_wash.add_indicators(create_indicators_wash(None))
+    pongamia_livelihood = pmf.PerformanceManagementFramework('Livelihood', 'Evaluation', profile=profile, cache=cache, max_workers=max_workers, batch=batch, significance=significance, weights=weights, reuse=reuse)
+    pongamia_livelihood.add_indicators(create_indicators_livelihood(None))
+    pongamia = pmf.PerformanceManagementFramework('Overall', 'Evaluation', profile=profile, cache=cache, max_workers=max_workers, batch=batch, significance=significance, weights=weights, reuse=reuse)
+    pongamia.add_indicators(create_indicators(None))
 
-sri_extraction(df_livelihood, ['3', '2', '4', 'state', '7', 'Disability'])
-pongamia_livelihood = pmf.PerformanceManagementFramework('Livelihood', 'Evaluation')
-indicators_livelihood = create_indicators_livelihood(df_livelihood)
-pongamia_livelihood.add_indicators(indicators_livelihood)
+    # Segments of the dataset by survey type ('0'): the dataset is loaded and prepared once for the three PMFs
+    pongamia_run = pmf.Segmented_PMF('0')
+    # (PMF, survey types of the segment (None: all respondents), file path to save the statistics, folder for saving visuals)
+    pongamia_run.add_segment(pongamia_wash, ['No'], 'data/24-NEF-GLO-1 - WASH Statistics.xlsx', 'visuals/wash/')
+    pongamia_run.add_segment(pongamia_livelihood, ['Yes'], 'data/24-NEF-GLO-1 - Livelihood Statistics.xlsx', 'visuals/livelihoods/')
+    pongamia_run.add_segment(pongamia, None, 'data/24-NEF-GLO-1 - Statistics.xlsx', 'visuals/')
 
-file_path1 = 'data/24-NEF-GLO-1 - Livelihood Statistics.xlsx'
-folder = 'visuals/livelihoods/'
-pongamia_livelihood.PMF_generation(file_path1, folder)
+    # Load only the columns used by the indicators, the survey type split ('0') and the SRI extraction
+    sri_cols = ['3', '2', '4', 'state', '7', 'Disability']
+    columns = ['sri'] + sri_cols + pongamia_run.required_columns()
 
-pongamia = pmf.PerformanceManagementFramework('Overall', 'Evaluation')
-indicators = create_indicators(df)
-pongamia.add_indicators(indicators)
+    # Specify the file path for the clean dataset (the columnar copy saved next to it is used when it is newer)
+    # The dtype schema of the preprocessing (data_preprocessing.py) is applied when the xlsx/csv file is read instead
+    df = dp.load_cleaned_data('data/24-NEF-GLO-1 - Data_cleaned.xlsx', columns=columns, schema=schema)
 
-file_path1 = 'data/24-NEF-GLO-1 - Statistics.xlsx'
-folder = 'visuals/'
-pongamia.PMF_generation(file_path1, folder)
\ No newline at end of file
+    sri_extraction(df[df['0'] == 'Yes'], sri_cols, significance=significance)
+    pongamia_run.add_data(df)
+    pongamia_run.PMF_generation() # Run the PMFs
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Jan 22 14:36:05 2025
+
+@author: Bodhi Global Analysis (Jungyeon Lee)
+"""
+
+"""
+Dtype schema of the survey columns
+- Each column is declared as (type, answers)
+-> ('category', None): Nominal answers taken from the data
+-> ('category', [answers]): Nominal answers, declared answers and any other answers found in the data
+-> ('ordered', [answers]): Ordered answers (same order as Indicator.add_var_order), other answers found in the data come last
+- Nominal categories are sorted alphabetically, so tables keep the same row order as with text columns
+-> ('float', None), ('int', None), ('str', None): Numeric or text columns
+"""
+
+import pandas as pd
+import numpy as np
+from pandas.api.types import union_categoricals
+
+def categorical(series, answers=None, ordered=False):
+    """
+    - To encode a survey column as a categorical (integer codes instead of Python strings)
+    series: Series, Column of the survey answers
+    answers: list, Declared answers of the question (None: taken from the data)
+    ordered: bool, Whether the answers are ordered
+    """
+    observed = series.dropna().unique()
+    answers = list(answers) if answers is not None else []
+    extra = sorted([value for value in observed if value not in answers], key=str)
+    if ordered:
+        categories = answers + extra
+    else:
+        categories = sorted(answers + extra, key=str)
+    return pd.Categorical(series, categories=pd.Index(categories, dtype=object), ordered=ordered)
+
+def apply_schema(df, schema):
+    """
+    - To convert the columns of a dataframe to the dtypes declared in the schema (columns missing from the data are skipped)
+    df: Dataframe, Dataframe of this project
+    schema: dic, Column -> (type, answers) {'0': ('category', ['Yes', 'No']), etc}
+    """
+    if not schema:
+        return df
+    for col, (dtype, answers) in schema.items():
+        if col not in df.columns:
+            continue
+        if dtype in ['category', 'ordered']:
+            df[col] = categorical(df[col], answers, ordered=dtype == 'ordered')
+        elif dtype == 'float':
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(float)
+        elif dtype == 'int':
+            values = pd.to_numeric(df[col], errors='coerce')
+            df[col] = values.astype(np.int32) if values.notna().all() else values.astype(float)
+        elif dtype == 'str':
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+        else:
+            print(f"Unknown type in the schema: {col} ({dtype})")
+    return df
+
+def concat_chunks(chunks, schema=None):
+    """
+    - To combine chunks of a dataframe, merging the categories of categorical columns instead of falling back to Python objects
+    chunks: list, Dataframes with the same columns
+    schema: dic, Column -> (type, answers) to restore the category order after merging
+    """
+    columns = chunks[0].columns
+    cat_cols = [col for col in columns if any(isinstance(chunk[col].dtype, pd.CategoricalDtype) for chunk in chunks)]
+    df = pd.concat([chunk.drop(columns=cat_cols) for chunk in chunks])
+    merged = {col: union_categoricals([pd.Categorical(chunk[col]) for chunk in chunks], ignore_order=True) for col in cat_cols}
+    df = pd.concat([df, pd.DataFrame(merged, index=df.index)], axis=1)[columns]
+    if schema:
+        df = apply_schema(df, {col: spec for col, spec in schema.items() if col in cat_cols})
+    return df
+
+def replace_answers(series, mapping):
+    """
+    - To replace answers of a column (categoricals keep their dtype, replaced answers are removed from the categories)
+    series: Series, Column of the survey answers
+    mapping: dic, Old answer -> new answer {'Average': 'Moderate', etc}
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return series.replace(mapping)
+    dtype = series.dtype
+    categories = [value for value in dtype.categories if value not in mapping]
+    categories += [value for value in mapping.values() if value not in categories]
+    values = series.astype(object).replace(mapping)
+    return pd.Series(pd.Categorical(values, categories=categories, ordered=dtype.ordered), index=series.index, name=series.name)
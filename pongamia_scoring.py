@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Jan 16 11:02:37 2025
+
+@author: Bodhi Global Analysis (Jungyeon Lee)
+"""
+
+import numpy as np
+
+# Scoring modes of Data_analysis.calculation handled by this module
+score_methods = ['score', 'score_average', 'score_sum', 'score_select_allyes', 'score_select_allno',
+                 'score_select_anyyes', 'score_select_anyno', 'score_select_manual']
+
+# Columns of the manual code (manual_score): answers scored +1 for 'Yes' and -1 for 'No', and +1 for 'No'
+manual_yes_no = ['col1', 'col2', 'col3', 'col4']
+manual_no = ['col5', 'col6']
+
+# Columns read by a scoring mode besides the variables of the indicator (loaded with them, Indicator.columns)
+score_columns = {'score_select_manual': manual_yes_no + manual_no}
+
+def mapped_scores(df, columns, score_map):
+    """
+    - To score every related column at once (answers missing from the score map score 0)
+    df: Dataframe, Dataframe of this project
+    columns: list, Variables related to the indicator
+    score_map: dic, Score of each answer {'A':3, 'B':-1, etc}
+    """
+    scores = [df[col].map(score_map).astype(float).fillna(0).to_numpy() for col in columns]
+    return np.column_stack(scores)
+
+def manual_score(df):
+    """
+    - Manual code for multiple selecting (adjust the columns, answers and scores)
+    df: Dataframe, Dataframe of this project
+    """
+    score = df[manual_yes_no].eq('Yes').sum(axis=1) # Assign and adjust the response for +1 score
+    score -= df[manual_yes_no].eq('No').sum(axis=1) # Assign the response for -1 score
+    score += df[manual_no].eq('No').sum(axis=1) # Assign the response for +1 score
+    return score.to_numpy()
+
+def pass_status(df, method, columns, score_map=None, valid_point=None):
+    """
+    - To evaluate whether each data point passes the indicator, column by column instead of row by row
+    df: Dataframe, Dataframe of this project
+    method: str, How to calculate this indicator? (score_methods)
+    columns: list, Variables related to the indicator
+    score_map: dic, Score of each answer {'A':3, 'B':-1, etc}
+    valid_point: int, Valid point for the indicator (treat from this point as the numerator)
+    """
+    if method == 'score':
+        column = columns[0] if isinstance(columns, list) else columns
+        if score_map is not None:
+            score = df[column].map(score_map).astype(float).to_numpy()
+        else: score = df[column].to_numpy()
+        passed = score >= valid_point
+    elif method == 'score_average':
+        passed = mapped_scores(df, columns, score_map).sum(axis=1) / len(columns) >= valid_point
+    elif method == 'score_sum':
+        passed = mapped_scores(df, columns, score_map).sum(axis=1) >= valid_point
+    elif method == 'score_select_allyes':
+        passed = df[columns].eq('Yes').all(axis=1).to_numpy()
+    elif method == 'score_select_allno':
+        passed = df[columns].eq('No').all(axis=1).to_numpy()
+    elif method == 'score_select_anyyes':
+        passed = df[columns].eq('Yes').any(axis=1).to_numpy()
+    elif method == 'score_select_anyno':
+        passed = df[columns].eq('No').any(axis=1).to_numpy()
+    elif method == 'score_select_manual':
+        passed = manual_score(df) >= valid_point
+    return np.where(passed, 'Pass', 'Not Pass')
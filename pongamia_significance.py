@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Jan 30 11:26:43 2025
+
+@author: Bodhi Global Analysis (Jungyeon Lee)
+"""
+
+"""
+Significance tests of the breakdown tables
+- Chi-square test of independence (Pearson, no continuity correction) for answers x breakdown groups
+- One-way ANOVA for numeric scores (e.g. 'sri') across breakdown groups
+- With design weights, both tests are based on the effective sample size (Kish) of the table
+- All tables of a block are tested together: the statistics are computed on stacked arrays and the p-values
+  come from one call to the chi2 / F distribution of scipy (scipy is only imported when a test is run)
+"""
+
+import numpy as np
+import pandas as pd
+
+def chi_square(tables):
+    """
+    - To run a chi-square test of independence on several contingency tables at once
+    -> Answers or groups without any respondent are left out of the test (they have no expected count)
+    -> Tables with fewer than 2 answers or 2 groups get no p-value
+    tables: list, Count tables (answers x groups)
+    """
+    from scipy.stats import chi2
+    if len(tables) == 0:
+        return np.empty(0), np.empty(0, dtype=int), np.empty(0)
+    n_rows = max(table.shape[0] for table in tables)
+    n_cols = max(table.shape[1] for table in tables)
+    observed = np.zeros((len(tables), n_rows, n_cols))
+    for i, table in enumerate(tables):
+        observed[i, :table.shape[0], :table.shape[1]] = np.asarray(table, dtype=float)
+    row_sums = observed.sum(axis=2)
+    col_sums = observed.sum(axis=1)
+    total = row_sums.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        expected = row_sums[:, :, None] * col_sums[:, None, :] / total[:, None, None]
+        cells = np.where(expected > 0, (observed - expected) ** 2 / expected, 0)
+    statistic = cells.sum(axis=(1, 2))
+    dof = ((row_sums > 0).sum(axis=1) - 1) * ((col_sums > 0).sum(axis=1) - 1)
+    p_value = np.where(dof > 0, chi2.sf(statistic, np.maximum(dof, 1)), np.nan)
+    statistic = np.where(dof > 0, statistic, np.nan)
+    return statistic, dof, p_value
+
+def anova(values, groupings, weights=None):
+    """
+    - To run a one-way ANOVA of one numeric column across the groups of several breakdowns at once
+    -> Respondents without a score or a group are left out, groups without respondents are not counted
+    -> With design weights, the group means and sums of squares are weighted and the degrees of freedom
+       within the groups come from the effective sample size of each breakdown (Kish), as in the chi-square test
+    values: array, Numeric scores of the respondents
+    groupings: list, Group codes of the respondents for each breakdown (-1: no group, Dataset_context.group_codes)
+    weights: array, Design weights of the respondents (None: every respondent counts once)
+    """
+    from scipy.stats import f
+    values = np.asarray(values, dtype=float)
+    n_groups = max([int(codes.max()) + 1 if len(codes) else 0 for codes in groupings] + [1])
+    counts = np.zeros((len(groupings), n_groups))
+    sums = np.zeros((len(groupings), n_groups))
+    squares = np.zeros((len(groupings), n_groups))
+    n = np.zeros(len(groupings))
+    for i, codes in enumerate(groupings):
+        valid = (codes >= 0) & ~np.isnan(values)
+        w = np.ones(valid.sum()) if weights is None else weights[valid]
+        counts[i] = np.bincount(codes[valid], weights=w, minlength=n_groups)
+        sums[i] = np.bincount(codes[valid], weights=w * values[valid], minlength=n_groups)
+        squares[i] = np.bincount(codes[valid], weights=w * values[valid] ** 2, minlength=n_groups)
+        n[i] = w.sum() ** 2 / (w ** 2).sum() if (w ** 2).sum() > 0 else 0
+    k = (counts > 0).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = np.where(counts > 0, sums / counts, 0)
+        grand_mean = sums.sum(axis=1) / counts.sum(axis=1)
+        between = (counts * (means - grand_mean[:, None]) ** 2).sum(axis=1)
+        within = (squares - counts * means ** 2).sum(axis=1)
+        df_between, df_within = k - 1, n - k
+        statistic = (between / df_between) / (within / df_within)
+    testable = (df_between > 0) & (df_within > 0)
+    p_value = np.where(testable, f.sf(statistic, np.maximum(df_between, 1), np.where(testable, df_within, 1)), np.nan)
+    statistic = np.where(testable, statistic, np.nan)
+    df_within = np.round(df_within).astype(int) if weights is None else np.round(df_within, 1)
+    return statistic, df_between.astype(int), df_within, p_value
+
+def significance_table(labels, test, statistic, dof, p_value):
+    """
+    - Table of the test results of a breakdown block (one row per breakdown)
+    labels: list, Names of the breakdowns
+    test: str, Name of the test ('Chi-square' or 'ANOVA')
+    statistic: array, Test statistics
+    dof: list, Degrees of freedom
+    p_value: array, p-values
+    """
+    table = pd.DataFrame({'Test': test, 'Statistic': np.round(statistic, 3), 'df': dof, 'p-value': np.round(p_value, 4)},
+                         index=pd.Index(labels, name='Significance'))
+    return table
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Jan 13 10:12:41 2025
+
+@author: Bodhi Global Analysis (Jungyeon Lee)
+"""
+
+import pandas as pd
+from pandas.api.types import is_bool, is_float, is_integer, is_scalar
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, Side
+from openpyxl.compat import safe_string
+from openpyxl.utils import get_column_letter
+import datetime
+import math
+
+# Style of the header and index cells written by DataFrame.to_excel
+thin = Side(style='thin')
+header_style = {'font': Font(bold=True), 'border': Border(left=thin, right=thin, top=thin, bottom=thin),
+                'alignment': Alignment(horizontal='center', vertical='top')}
+
+def stored_length(value):
+    """
+    - Length of a cell value as it reads back from the saved file
+    value: Cell value
+    """
+    if isinstance(value, float):
+        text = safe_string(value)
+        value = float(text) if any(char in text for char in '.Ee') else int(text)
+    return len(str(value))
+
+def cell_value(value):
+    """
+    - Convert a dataframe value into a value openpyxl can write (same rules as DataFrame.to_excel)
+    -> Missing values are written as empty strings, infinite values as 'inf' / '-inf'
+    value: Cell value
+    """
+    if value is None or (is_scalar(value) and pd.isna(value)):
+        return ''
+    elif is_float(value) and math.isinf(value):
+        return 'inf' if value > 0 else '-inf'
+    elif is_bool(value):
+        return bool(value)
+    elif is_integer(value):
+        return int(value)
+    elif is_float(value):
+        return float(value)
+    elif isinstance(value, (datetime.date, datetime.timedelta)):
+        return value
+    return str(value)
+
+def block_rows(df, header=True, index=True, merge_cells=True, **options):
+    """
+    - To lay out a table row by row with the same cells and header styles as DataFrame.to_excel
+    -> Each row is a dict of column: (value, style), the rows are produced one at a time
+    -> Index levels (but the last) are written once per group of equal values when merge_cells is True (the write-only
+       workbook cannot merge cells), MultiIndex columns are written on one row with the levels joined by '.'
+    df: Dataframe, Table to be written
+    header: bool or list, Write the column names (list: names written instead of the column names)
+    index: bool, Write the index
+    merge_cells: bool, Write repeated index values only once
+    options: Other keyword arguments of DataFrame.to_excel (startcol is placed by the caller)
+    """
+    levels = df.index.nlevels if index else 0
+    hierarchical = isinstance(df.index, pd.MultiIndex)
+    if header is not False:
+        names = header if isinstance(header, list) else df.columns
+        row = {levels + i: ('.'.join(map(str, name)) if isinstance(name, tuple) else cell_value(name), header_style)
+               for i, name in enumerate(names)}
+        if index and hierarchical and any(name is not None for name in df.index.names):
+            row.update({i: (cell_value(name), header_style) for i, name in enumerate(df.index.names)})
+        elif index and not hierarchical and df.index.names[0]:
+            row[0] = (cell_value(df.index.names[0]), header_style)
+        yield row
+    previous = None
+    for values in df.itertuples(index=index, name=None):
+        row = {}
+        if index:
+            labels = values[0] if hierarchical else (values[0],)
+            values = values[1:]
+            changed = False
+            for i, label in enumerate(labels):
+                # A level starts a new group when its value or the value of a higher level changes (the last level is always written)
+                changed = changed or previous is None or not merge_cells or label != previous[i]
+                if changed or i == len(labels) - 1:
+                    row[i] = (cell_value(label), header_style)
+            previous = labels
+        row.update({levels + i: (cell_value(value), None) for i, value in enumerate(values)})
+        yield row
+
+class Workbook_session:
+
+    def __init__(self, file_path, first_sheet='Tables', write_only=False):
+        """
+        - Initialise the workbook session (collects all sheets in memory and writes the file once)
+
+        file_path: str, Directory to save the workbook
+        first_sheet: str, Name of the empty sheet placed at the front of the workbook (None: no empty sheet)
+        write_only: bool, Stream each sheet's rows to the file as soon as the sheet is complete
+        -> False: Keep the whole workbook in memory until save()
+        -> True: Keep only the sheet currently being built in memory (openpyxl write-only workbook)
+        """
+        self.file_path = file_path
+        self.first_sheet = first_sheet
+        self.write_only = write_only
+        self.sheets = {}
+        self.written = []
+        self.records = None
+        self.wb = None
+        if write_only:
+            self.wb = Workbook(write_only=True)
+            if first_sheet is not None:
+                self.wb.create_sheet(first_sheet)
+
+    def add_sheet(self, sheet_name, description=None, autofit=True):
+        """
+        - Register a new sheet (or return the existing one with the same name)
+        sheet_name: str, Excel sheet name
+        description: str, Title written in bold in the first row of the sheet (None: no title row)
+        autofit: bool, Fit the column widths to the longest value of each column
+        """
+        if self.records is not None:
+            self.records.append(('sheet', sheet_name, description, autofit))
+        if self.write_only:
+            for name in [name for name in self.sheets if name != sheet_name]:
+                self.stream_sheet(name)
+            if sheet_name in self.written:
+                print(f"'{sheet_name}' has already been written, a new sheet will be added")
+        if sheet_name not in self.sheets:
+            self.sheets[sheet_name] = {'description': description, 'autofit': autofit, 'blocks': []}
+        elif description is not None:
+            self.sheets[sheet_name]['description'] = description
+        return self.sheets[sheet_name]
+
+    def add_block(self, sheet_name, df, startrow=0, **options):
+        """
+        - Add a table to a sheet
+        sheet_name: str, Excel sheet name
+        df: Dataframe, Table to be written
+        startrow: int, Row of the sheet where the table starts (below the title row)
+        options: Keyword arguments passed to DataFrame.to_excel (index, header, merge_cells, startcol)
+        """
+        sheet = self.add_sheet(sheet_name)
+        if self.records is not None:
+            self.records.append(('block', sheet_name, df, startrow, options))
+        sheet['blocks'].append((df, startrow, options))
+
+    def start_record(self):
+        """
+        - Start recording the sheets and tables added to the workbook (to reuse them in a later run, pongamia_cache)
+        """
+        self.records = []
+
+    def stop_record(self):
+        """
+        - Stop recording and return the recorded sheets and tables
+        """
+        records, self.records = self.records, None
+        return records
+
+    def replay(self, records):
+        """
+        - Add recorded sheets and tables to the workbook, in the order they were added
+        records: list, Records from stop_record
+        """
+        for record in records:
+            if record[0] == 'sheet':
+                self.add_sheet(*record[1:])
+            else:
+                sheet_name, df, startrow, options = record[1:]
+                self.add_block(sheet_name, df, startrow, **options)
+
+    def column_widths(self, ws):
+        """
+        - To fit the column widths of a worksheet to its longest value (as it is stored in the file)
+        ws: Worksheet, openpyxl worksheet
+        """
+        for column in ws.columns:
+            max_length = 0
+            column_letter = column[0].column_letter
+            for cell in column:
+                if cell.value:
+                    max_length = max(max_length, stored_length(cell.value))
+            ws.column_dimensions[column_letter].width = max_length + 2
+
+    def sheet_rows(self, sheet):
+        """
+        - Rows of a sheet, from its title and tables laid out side by side (only the current row of each table is in memory)
+        -> Each row is a dict of column: (value, style), rows without any cell are empty dicts
+        sheet: dict, Sheet from add_sheet
+        """
+        title_row = 1 if sheet['description'] is not None else 0
+        if title_row:
+            yield {1: (sheet['description'], {'font': Font(bold=True)})}
+        blocks = []
+        for df, startrow, options in sheet['blocks']:
+            height = (options.get('header', True) is not False) + len(df)
+            blocks.append((startrow, startrow + height, options.get('startcol', 0), block_rows(df, **options)))
+        for r in range(max([end for _, end, _, _ in blocks], default=0)):
+            row = {}
+            for start, end, startcol, rows in blocks:
+                if start <= r < end:
+                    row.update({startcol + col: cell for col, cell in next(rows).items()})
+            yield row
+
+    def stream_sheet(self, sheet_name):
+        """
+        - Write a complete sheet row by row to the write-only workbook and release it from memory
+        -> The column widths are measured in a first pass over the rows, as they have to be set before the first row
+        sheet_name: str, Excel sheet name
+        """
+        sheet = self.sheets.pop(sheet_name)
+        ws = self.wb.create_sheet(sheet_name)
+        if sheet['autofit']:
+            widths = {}
+            for row in self.sheet_rows(sheet):
+                for col, (value, style) in row.items():
+                    widths[col] = max(widths.get(col, 0), stored_length(value) if value else 0)
+            for col in range(max(widths, default=-1) + 1):
+                ws.column_dimensions[get_column_letter(col + 1)].width = widths.get(col, 0) + 2
+        empty = 0
+        for row in self.sheet_rows(sheet):
+            if not row:
+                # Empty rows are only written when a later row has cells
+                empty += 1
+                continue
+            for _ in range(empty):
+                ws.append([])
+            empty = 0
+            cells = [None] * (max(row) + 1)
+            for col, (value, style) in row.items():
+                cell = WriteOnlyCell(ws, value=value)
+                for key, item in (style or {}).items():
+                    setattr(cell, key, item)
+                cells[col] = cell
+            ws.append(cells)
+        self.written.append(sheet_name)
+
+    def save(self):
+        """
+        - Write every collected sheet to the workbook in a single pass
+        """
+        if self.write_only:
+            for sheet_name in list(self.sheets):
+                self.stream_sheet(sheet_name)
+            self.wb.save(self.file_path)
+            print(f"Statistics have been saved: {self.file_path}")
+            return True
+
+        with pd.ExcelWriter(self.file_path, engine='openpyxl') as writer:
+            if self.first_sheet is not None:
+                pd.DataFrame().to_excel(writer, sheet_name=self.first_sheet, index=False)
+            for sheet_name, sheet in self.sheets.items():
+                title_row = 1 if sheet['description'] is not None else 0
+                for df, startrow, options in sheet['blocks']:
+                    # Leave the first row free for the description
+                    df.to_excel(writer, sheet_name=sheet_name, startrow=startrow + title_row, **options)
+                ws = writer.book[sheet_name]
+                if title_row:
+                    ws['B1'] = sheet['description']
+                    ws['B1'].font = Font(bold=True)
+                if sheet['autofit']:
+                    self.column_widths(ws)
+        print(f"Statistics have been saved: {self.file_path}")
+        return True
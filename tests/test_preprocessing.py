@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Jan 22 16:05:18 2025
+
+@author: Bodhi Global Analysis (Jungyeon Lee)
+"""
+
+"""
+Loading of the cleaned dataset (pongamia_data_preprocessing.load_cleaned_data)
+
+python -m pytest tests
+"""
+
+import os
+import sys
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pongamia_data_preprocessing as dp
+
+schema = {'0': ('category', ['Yes', 'No']), '141': ('ordered', ['Very low', 'Low', 'Moderate', 'High', 'Very high'])}
+
+def test_schema_applied_without_columnar_copy(tmp_path):
+    file_path = str(tmp_path / 'data_cleaned.csv')
+    pd.DataFrame({'0': ['Yes', 'No', 'Yes'], '141': ['High', 'Low', None], 'age': [21, 35, 48]}).to_csv(file_path, index=False)
+    df = dp.load_cleaned_data(file_path, columns=['0', '141', 'age'], schema=schema)
+    assert list(df['0'].cat.categories) == ['No', 'Yes']
+    assert df['141'].cat.ordered
+    assert list(df['141'].cat.categories) == schema['141'][1]
+    assert df['age'].dtype == 'int64'
+
+def test_no_schema_keeps_file_types(tmp_path):
+    file_path = str(tmp_path / 'data_cleaned.csv')
+    pd.DataFrame({'0': ['Yes', 'No']}).to_csv(file_path, index=False)
+    assert dp.load_cleaned_data(file_path)['0'].dtype == object
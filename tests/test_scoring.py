@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Jan 16 15:26:10 2025
+
+@author: Bodhi Global Analysis (Jungyeon Lee)
+"""
+
+"""
+Vectorised scoring engine (pongamia_scoring) against the previous row-by-row calculation
+- Every scoring mode must give exactly the same Pass/Not Pass labels as the row-wise version
+- 'score' is checked with var as a list, as Data_analysis.calculation passes it (indicator.var), with and without a score map
+  -> The row-wise version only worked with a single column name: with a list it raised an error (DataFrame.map of a dict,
+     or an ambiguous truth value without a score map). The list cases are compared with its single-column result
+- 'score_select_anyyes' never ran in the row-wise version (a hidden backspace in the method name, no column was created),
+  the row-wise reference here is the intended 'any answer is Yes' rule
+
+python -m pytest tests
+"""
+
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pongamia_scoring as sc
+
+columns = ['col1', 'col2', 'col3', 'col4', 'col5', 'col6']
+score_map = {'Yes': 2, 'No': -1, 'Unsure': 0.5}
+valid_points = {'score': 1, 'score_average': 0.5, 'score_sum': 3, 'score_select_manual': 1}
+
+def dataset(n=2000):
+    """
+    - Answers of the respondents, with missing answers and answers outside the score map
+    """
+    rng = np.random.default_rng(0)
+    answers = np.array(['Yes', 'No', 'Unsure', 'Other', np.nan], dtype=object)
+    df = pd.DataFrame({col: rng.choice(answers, n, p=[0.4, 0.3, 0.1, 0.1, 0.1]) for col in columns})
+    df['points'] = np.where(rng.random(n) < 0.1, np.nan, rng.integers(0, 5, n))
+    return df
+
+def rowwise(df, method, valid_point, var='col1', score_map=score_map):
+    """
+    - Row-by-row calculation as it was done in Data_analysis.calculation
+    """
+    if method == 'score':
+        score = df[var].map(score_map) if score_map is not None else df[var]
+        return score.apply(lambda x: 'Pass' if x >= valid_point else 'Not Pass')
+    elif method == 'score_average':
+        def scoring(row):
+            score = 0
+            for col in columns:
+                score += score_map.get(row[col], 0)
+            return score / len(columns)
+        return df.apply(scoring, axis=1).apply(lambda x: 'Pass' if x >= valid_point else 'Not Pass')
+    elif method == 'score_sum':
+        def scoring(row):
+            score = 0
+            for col in columns:
+                score += score_map.get(row[col], 0)
+            return score
+        return df.apply(scoring, axis=1).apply(lambda x: 'Pass' if x >= valid_point else 'Not Pass')
+    elif method in ['score_select_allyes', 'score_select_allno', 'score_select_anyyes', 'score_select_anyno']:
+        answer = 'Yes' if method.endswith('yes') else 'No'
+        check = all if '_all' in method else any
+        response = df.apply(lambda row: check(row[var] == answer for var in columns), axis=1)
+        return response.apply(lambda x: 'Pass' if x else 'Not Pass')
+    elif method == 'score_select_manual':
+        def scoring(row):
+            score = 0
+            for col in ['col1', 'col2', 'col3', 'col4']:
+                if row[col] == 'Yes':
+                    score += 1
+                elif row[col] == 'No':
+                    score -= 1
+            for col in ['col5', 'col6']:
+                if row[col] == 'No':
+                    score += 1
+            return score
+        return df.apply(scoring, axis=1).apply(lambda x: 'Pass' if x >= valid_point else 'Not Pass')
+
+# (label, method, variables passed to pass_status, score map, column of the row-wise version)
+cases = [('score', 'score', 'col1', score_map, 'col1'),
+         ('score [list]', 'score', ['col1'], score_map, 'col1'),
+         ('score [list, no map]', 'score', ['points'], None, 'points')]
+cases += [(method, method, columns, score_map, None) for method in sc.score_methods if method != 'score']
+
+@pytest.mark.parametrize('label, method, var, case_map, column', cases, ids=[case[0] for case in cases])
+def test_same_labels_as_rowwise(label, method, var, case_map, column):
+    df = dataset()
+    valid_point = valid_points.get(method)
+    expected = rowwise(df, method, valid_point, column, case_map) if method == 'score' else rowwise(df, method, valid_point)
+    result = sc.pass_status(df, method, var, case_map, valid_point)
+    assert np.array_equal(expected.to_numpy(dtype=object), result.astype(object))
+
+def test_every_scoring_mode_is_checked():
+    assert {case[1] for case in cases} == set(sc.score_methods)
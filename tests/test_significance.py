@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Feb 3 10:14:22 2025
+
+@author: Bodhi Global Analysis (Jungyeon Lee)
+"""
+
+"""
+Significance tests written next to the breakdown blocks (pongamia_significance, Data_analysis.significance_tests)
+
+python -m pytest tests
+"""
+
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pongamia_indicator as bd
+import pongamia_dataset as ds
+import pongamia_workbook as wbk
+import pongamia_data_analysis as bodhi
+
+def dataset(n=300):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({'105-1': rng.integers(0, 2, n), # Split column of a select_multiple question (0/1)
+                         'coded': rng.integers(1, 4, n), # Coded single-select answer
+                         'sri': rng.normal(2, 0.5, n).round(2),
+                         'gender': rng.choice(['Male', 'Female'], n),
+                         'country': rng.choice(['Sudan', 'South Sudan'], n)})
+
+def significance_block(indicator, df, weights=None):
+    """
+    - Significance block written by the tables of one indicator
+    """
+    tool = bodhi.Data_analysis('Test', [indicator], ds.Dataset_context(df))
+    tool.significance = True
+    tool.weights = weights
+    book = wbk.Workbook_session(None, first_sheet=None)
+    book.start_record()
+    tool.tables(indicator, indicator.var, 'sheet', 'var', book, 'visuals/')
+    blocks = [record[2] for record in book.stop_record() if record[0] == 'block']
+    return [block for block in blocks if block.index.name == 'Significance'][0]
+
+def indicator(var):
+    indicator = bd.Indicator(None, var, None, [var], i_cal=None, i_type='percentage', description=var, period='endline', target=None)
+    indicator.add_breakdown({'gender': 'Gender', 'country': 'Country'})
+    return indicator
+
+def test_binary_column_gets_chi_square():
+    block = significance_block(indicator('105-1'), dataset())
+    assert list(block['Test']) == ['Chi-square', 'Chi-square']
+    assert list(block['df']) == [1, 1]
+
+def test_coded_answer_gets_chi_square():
+    block = significance_block(indicator('coded'), dataset())
+    assert list(block['Test']) == ['Chi-square', 'Chi-square']
+    assert list(block['df']) == [2, 2]
+
+def test_declared_score_gets_anova():
+    score = indicator('sri')
+    score.add_numeric()
+    block = significance_block(score, dataset())
+    assert list(block['Test']) == ['ANOVA', 'ANOVA']
+    assert list(block['df']) == ['1, 298', '1, 298']
+
+def test_declared_answers_get_chi_square():
+    score = indicator('coded')
+    score.add_numeric()
+    score.add_var_order([1, 2, 3])
+    block = significance_block(score, dataset())
+    assert list(block['Test']) == ['Chi-square', 'Chi-square']
+
+def test_weighted_score_anova():
+    df = dataset()
+    df['w'] = np.random.default_rng(1).uniform(0.5, 3, len(df))
+    score = indicator('sri')
+    score.add_numeric()
+    unweighted = significance_block(score, df)
+    weighted = significance_block(score, df, weights='w')
+    assert list(weighted['Test']) == ['ANOVA', 'ANOVA']
+    assert all(float(dof.split(', ')[1]) < 298 for dof in weighted['df'])
+    assert not np.allclose(weighted['Statistic'], unweighted['Statistic'])
+    # Equal weights give the unweighted test
+    df['w'] = 2.5
+    equal = significance_block(score, df, weights='w')
+    assert np.allclose(equal['Statistic'], unweighted['Statistic'])
+    assert list(equal['df']) == ['1, 298.0', '1, 298.0']